@@ -0,0 +1,55 @@
+"""
+benchmark_board.py
+Compares the array GoBoard with the BitBoard backend on random games.
+
+Both boards play the same random games (same seed), so the final positions
+are checked against each other as well.
+
+Usage: python3 benchmark_board.py [boardsize] [number of games]
+"""
+import random
+import sys
+import time
+
+from board import GoBoard
+from bit_board import BitBoard
+
+
+def play_random_games(board_class, size: int, num_games: int, seed: int):
+    """
+    Play num_games random games, undoing every game move by move.
+    Returns the number of moves played, the elapsed time and the final
+    position of every game.
+    """
+    rng = random.Random(seed)
+    num_moves = 0
+    positions = []
+    start = time.time()
+    for _ in range(num_games):
+        board = board_class(size)
+        depth = 0
+        while not board.endOfGame():
+            moves = board.get_empty_points()
+            board.play_move(moves[rng.randrange(len(moves))], board.current_player)
+            depth += 1
+        positions.append((list(board.board), board.black_captures, board.white_captures))
+        for _ in range(depth):
+            board.undoMove()
+        num_moves += depth
+    return num_moves, time.time() - start, positions
+
+
+def run() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    num_games = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    results = {}
+    for board_class in [GoBoard, BitBoard]:
+        num_moves, elapsed, positions = play_random_games(board_class, size, num_games, seed=455)
+        results[board_class.__name__] = positions
+        print("{:10} {:7d} moves {:8.3f}s {:10.0f} moves/s".format(
+            board_class.__name__, num_moves, elapsed, num_moves / elapsed))
+    assert results["GoBoard"] == results["BitBoard"], "boards disagree on final positions"
+
+
+if __name__ == "__main__":
+    run()
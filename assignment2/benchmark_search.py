@@ -0,0 +1,82 @@
+"""
+benchmark_search.py
+Compares plain alphabeta with principal variation search and aspiration
+windows (iterativeDeepening with pvs=True) on a fixed suite of positions.
+
+The suite is made of random openings from a fixed seed. Each position is
+searched to the same depth by both variants, each with a fresh table,
+and their values are checked against each other.
+
+Usage: python3 benchmark_search.py [boardsize] [number of positions] [depth]
+"""
+import random
+import sys
+import time
+
+from board import GoBoard
+from solver import iterativeDeepening
+from transposition_table import TranspositionTable
+
+
+class CountingBoard(GoBoard):
+    """ GoBoard that counts the moves played on it, one per search node """
+    nodes = 0
+
+    def play_move(self, point, color):
+        CountingBoard.nodes += 1
+        return GoBoard.play_move(self, point, color)
+
+
+def position_suite(size: int, num_positions: int, seed: int):
+    """
+    Lists of moves leading to num_positions positions that are not over,
+    each 6 to 12 random moves from the empty board
+    """
+    rng = random.Random(seed)
+    suite = []
+    while len(suite) < num_positions:
+        board = GoBoard(size)
+        moves = []
+        for _ in range(rng.randrange(6, 13)):
+            empty = board.get_empty_points()
+            move = int(empty[rng.randrange(len(empty))])
+            board.play_move(move, board.current_player)
+            moves.append(move)
+        if not board.endOfGame():
+            suite.append(moves)
+    return suite
+
+
+def search(moves, size: int, depth: int, pvs: bool):
+    board = CountingBoard(size)
+    for move in moves:
+        GoBoard.play_move(board, move, board.current_player)
+    CountingBoard.nodes = 0
+    for _, value, _ in iterativeDeepening(board, depth, TranspositionTable(16), pvs=pvs):
+        pass
+    return value, CountingBoard.nodes
+
+
+def run() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    num_positions = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    depth = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    suite = position_suite(size, num_positions, seed=455)
+    totals = {False: [0, 0.0], True: [0, 0.0]}
+    print("{:>8} {:>12} {:>12}".format("position", "alphabeta", "pvs"))
+    for i, moves in enumerate(suite):
+        values = {}
+        nodes = {}
+        for pvs in (False, True):
+            start = time.time()
+            values[pvs], nodes[pvs] = search(moves, size, depth, pvs)
+            totals[pvs][0] += nodes[pvs]
+            totals[pvs][1] += time.time() - start
+        assert values[False] == values[True], "search variants disagree on position {}".format(i)
+        print("{:8d} {:12d} {:12d}".format(i, nodes[False], nodes[True]))
+    print("{:>8} {:12d} {:12d}".format("total", totals[False][0], totals[True][0]))
+    print("{:>8} {:11.2f}s {:11.2f}s".format("time", totals[False][1], totals[True][1]))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,92 @@
+"""
+benchmark_timelimit.py
+Checks that genmove and solve answer within the time limit.
+
+Plays a fixed suite of random 7x7 positions, from openings to crowded
+middle games where the threat search has many candidates, sends
+"timelimit 1" and then genmove and solve through the GTP connection,
+and reports the slowest answer of each. Answers more than
+ALLOWED_OVERRUN seconds over the limit are listed, and make the
+script exit with status 1.
+
+Usage: python3 benchmark_timelimit.py [number of positions] [timelimit]
+"""
+import io
+import random
+import sys
+import time
+
+import gtp_connection
+from board import GoBoard
+from gtp_connection import GtpConnection, format_point, point_to_coord
+from Ninuki import Go0
+
+"""
+Seconds an answer may take beyond the time limit: the searches stop at
+their next check, and the answer still has to be written
+"""
+ALLOWED_OVERRUN = 0.1
+
+
+def position_suite(size: int, num_positions: int, seed: int):
+    """
+    Lists of moves leading to num_positions positions that are not over,
+    each 4 to 30 random moves from the empty board
+    """
+    rng = random.Random(seed)
+    suite = []
+    while len(suite) < num_positions:
+        board = GoBoard(size)
+        moves = []
+        for _ in range(rng.randrange(4, 31)):
+            empty = board.get_empty_points()
+            move = int(empty[rng.randrange(len(empty))])
+            board.play_move(move, board.current_player)
+            moves.append(move)
+            if board.endOfGame():
+                break
+        if not board.endOfGame():
+            suite.append(moves)
+    return suite
+
+
+def timed(con: GtpConnection, command: str) -> float:
+    start = time.time()
+    con.get_cmd(command)
+    return time.time() - start
+
+
+def run() -> None:
+    num_positions = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    timelimit = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    size = 7
+    overruns = []
+    slowest = {"genmove": 0.0, "solve": 0.0}
+    stdout = gtp_connection.stdout
+    for i, moves in enumerate(position_suite(size, num_positions, seed=455)):
+        for command in ("genmove", "solve"):
+            board = GoBoard(size)
+            con = GtpConnection(Go0(), board)
+            gtp_connection.stdout = io.StringIO()    # the GTP answers are not needed
+            try:
+                con.get_cmd("timelimit {}".format(timelimit))
+                for move in moves:
+                    color = "b" if board.current_player == 1 else "w"
+                    con.get_cmd("play {} {}".format(color, format_point(point_to_coord(move, size))))
+                color = "b" if board.current_player == 1 else "w"
+                elapsed = timed(con, "genmove {}".format(color) if command == "genmove" else "solve")
+            finally:
+                gtp_connection.stdout = stdout
+            slowest[command] = max(slowest[command], elapsed)
+            if elapsed > timelimit + ALLOWED_OVERRUN:
+                overruns.append((i, command, elapsed))
+    for command, elapsed in slowest.items():
+        print("{:8} slowest answer {:.3f}s at timelimit {}".format(command, elapsed, timelimit))
+    for i, command, elapsed in overruns:
+        print("position {} {}: {:.3f}s".format(i, command, elapsed))
+    if overruns:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
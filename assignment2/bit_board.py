@@ -0,0 +1,259 @@
+"""
+bit_board.py
+Bitboard backend for GoBoard.
+
+Black and white stones are stored as two arbitrary-precision Python
+integers, with bit p set when point p of the padded 1D layout from
+coord_to_point holds a stone. BORDER points are never set in either
+integer, so a shifted line can never wrap from one row into the next:
+the padding column between rows always breaks it.
+
+BitBoard keeps the public API of the assignment2 GoBoard, so it can be
+passed to the solver or the simulation players in place of the array
+board. It also keeps the Zobrist codes and line-window counts up to date,
+which costs as much per move as on the array board; benchmark_board.py
+compares the two.
+"""
+
+import numpy as np
+import random
+from typing import Dict, List, Tuple
+
+from board import GoBoard, MoveJournal
+from board_base import (
+    opponent,
+    BLACK,
+    WHITE,
+    EMPTY,
+    BORDER,
+    MAXSIZE,
+    NO_POINT,
+    PASS,
+    GO_COLOR,
+    GO_POINT,
+)
+from zobrist_hash import get_hasher
+
+"""
+Capture rays of every on-board point, cached per board size.
+Each ray is a (pair_mask, end_mask) tuple: the two stones that are
+captured and the stone that brackets them, in one of the eight directions.
+"""
+_CAPTURE_RAYS: Dict[int, List[List[Tuple[int, int]]]] = {}
+
+
+def bits_to_points(bits: int) -> List[GO_POINT]:
+    """
+    Return the points of all set bits, in increasing order.
+    """
+    points: List[GO_POINT] = []
+    while bits:
+        low = bits & -bits
+        points.append(low.bit_length() - 1)
+        bits ^= low
+    return points
+
+
+class BitBoard(GoBoard):
+    def __init__(self, size: int) -> None:
+        """
+        Creates a bitboard of given size
+        """
+        assert 2 <= size <= MAXSIZE
+        self.reset(size)
+
+    def reset(self, size: int) -> None:
+        """
+        Creates a start state, an empty board with given size.
+        """
+        self.size: int = size
+        self.NS: int = size + 1
+        self.WE: int = 1
+        self.ko_recapture: GO_POINT = NO_POINT
+        self.last_move: GO_POINT = NO_POINT
+        self.last2_move: GO_POINT = NO_POINT
+        self.current_player: GO_COLOR = BLACK
+        self._set_geometry(size)
+        self.on_board: int = 0
+        row_bits = (1 << size) - 1
+        for row in range(1, size + 1):
+            self.on_board |= row_bits << self.row_start(row)
+        self.black: int = 0
+        self.white: int = 0
+        self.black_captures = 0
+        self.white_captures = 0
+        self.journal = MoveJournal(size)
+        self.hasher = get_hasher(size)
+        self.sym_zarray = self.hasher.symmetricArray(self.geometry.symmetries)
+        self.code = 0    # running Zobrist codes of the stones, packed like in GoBoard
+        self.directions: List[int] = [1, self.NS, self.NS + 1, self.NS - 1]
+        self.capture_rays = self._capture_rays()
+
+    def _capture_rays(self) -> List[List[Tuple[int, int]]]:
+        if self.size not in _CAPTURE_RAYS:
+            rays: List[List[Tuple[int, int]]] = [[] for _ in range(self.maxpoint)]
+            for point in bits_to_points(self.on_board):
+                for offset in self.geometry.capture_offsets:
+                    ray = [point + offset, point + offset*2, point + offset*3]
+                    if all(0 <= p < self.maxpoint and (self.on_board >> p) & 1 for p in ray):
+                        rays[point].append(((1 << ray[0]) | (1 << ray[1]), 1 << ray[2]))
+            _CAPTURE_RAYS[self.size] = rays
+        return _CAPTURE_RAYS[self.size]
+
+    def copy(self) -> 'BitBoard':
+        b = BitBoard.__new__(BitBoard)
+        b.__dict__.update(self.__dict__)
+        b.journal = MoveJournal(self.size)
+        b.window_counts = [None, list(self.window_counts[BLACK]), list(self.window_counts[WHITE])]
+        b.window_totals = [None, list(self.window_totals[BLACK]), list(self.window_totals[WHITE])]
+        return b
+
+    @property
+    def board(self) -> np.ndarray:
+        """
+        The board as a padded 1D array, in the same encoding as GoBoard.board.
+        Built on demand, so writing into it does not change the position.
+        """
+        board_array = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
+        board_array[bits_to_points(self.on_board)] = EMPTY
+        board_array[bits_to_points(self.black)] = BLACK
+        board_array[bits_to_points(self.white)] = WHITE
+        return board_array
+
+    def get_color(self, point: GO_POINT) -> GO_COLOR:
+        point = int(point)
+        if (self.black >> point) & 1:
+            return BLACK
+        if (self.white >> point) & 1:
+            return WHITE
+        if (self.on_board >> point) & 1:
+            return EMPTY
+        return BORDER
+
+    def is_legal(self, point: GO_POINT, color: GO_COLOR) -> bool:
+        if point == PASS:
+            return True
+        return self.get_color(point) == EMPTY
+
+    def get_empty_points(self) -> np.ndarray:
+        """
+        Return:
+            The empty points on the board
+        """
+        empty = self.on_board & ~(self.black | self.white)
+        return np.array(bits_to_points(empty), dtype=GO_POINT)
+
+    def num_empty_points(self) -> int:
+        return bin(self.on_board & ~(self.black | self.white)).count("1")
+
+    def random_empty_point(self) -> GO_POINT:
+        empty_points = self.get_empty_points()
+        return empty_points[random.randrange(len(empty_points))]
+
+    def play_move(self, point: GO_POINT, color: GO_COLOR) -> bool:
+        """
+        Tries to play a move of color on the point.
+        Returns whether or not the point was empty.
+        """
+        point = int(point)
+        if point < 0 or self.get_color(point) != EMPTY:
+            return False
+        if color == BLACK:
+            own, opp = self.black | (1 << point), self.white
+        else:
+            own, opp = self.white | (1 << point), self.black
+        captured = 0
+        for pair, end in self.capture_rays[point]:
+            if opp & pair == pair and own & end:
+                captured |= pair
+        opp &= ~captured
+        self.journal.push(point, color, self.black_captures, self.white_captures,
+                          self.last_move, self.last2_move)
+        sym_zarray = self.sym_zarray
+        self.code ^= sym_zarray[point][color]
+        self._add_to_windows(point, color)
+        for p in bits_to_points(captured):
+            self.journal.add_captured(p)
+            self.code ^= sym_zarray[p][opponent(color)]
+            self._remove_from_windows(p, opponent(color))
+        if color == BLACK:
+            self.black, self.white = own, opp
+        else:
+            self.white, self.black = own, opp
+        num_captured = bin(captured).count("1")
+        if color == BLACK:
+            self.black_captures += num_captured
+        else:
+            self.white_captures += num_captured
+        self.current_player = opponent(color)
+        self.last2_move = self.last_move
+        self.last_move = point
+        return True
+
+    def undoMove(self) -> None:
+        if len(self.journal) == 0:
+            return
+        row = self.journal.pop()
+        item = self.journal.entries.item
+        point = item(row, MoveJournal.POINT)
+        color = item(row, MoveJournal.COLOR)
+        self.black_captures = item(row, MoveJournal.BLACK_CAPTURES)
+        self.white_captures = item(row, MoveJournal.WHITE_CAPTURES)
+        self.last_move = item(row, MoveJournal.LAST_MOVE)
+        self.last2_move = item(row, MoveJournal.LAST2_MOVE)
+        num_captured = item(row, MoveJournal.NUM_CAPTURED)
+        captured_points = [item(row, i) for i in
+                           range(MoveJournal.CAPTURED, MoveJournal.CAPTURED + num_captured)]
+        captured = 0
+        for p in captured_points:
+            captured |= 1 << p
+        if color == BLACK:
+            self.black &= ~(1 << point)
+            self.white |= captured
+        else:
+            self.white &= ~(1 << point)
+            self.black |= captured
+        sym_zarray = self.sym_zarray
+        self.code ^= sym_zarray[point][color]
+        self._remove_from_windows(point, color)
+        for p in captured_points:
+            self.code ^= sym_zarray[p][opponent(color)]
+            self._add_to_windows(p, opponent(color))
+        self.current_player = color
+
+    def capturePiecesCount(self, point: GO_POINT, color: GO_COLOR) -> int:
+        """
+        Number of opponent stones that color would capture by playing on point.
+        """
+        own, opp = (self.black, self.white) if color == BLACK else (self.white, self.black)
+        count = 0
+        for pair, end in self.capture_rays[point]:
+            if opp & pair == pair and own & end:
+                count += 2
+        return count
+
+    def _has_five(self, stones: int) -> bool:
+        for d in self.directions:
+            pairs = stones & (stones >> d)
+            fours = pairs & (pairs >> 2 * d)
+            if fours & (stones >> 4 * d):
+                return True
+        return False
+
+    def detect_five_in_a_row(self) -> GO_COLOR:
+        """
+        Returns BLACK or WHITE if any five in a row is detected for the color
+        EMPTY otherwise.
+        """
+        if self._has_five(self.black):
+            return BLACK
+        if self._has_five(self.white):
+            return WHITE
+        return EMPTY
+
+    def endOfGame(self) -> bool:
+        if not self.on_board & ~(self.black | self.white):
+            return True
+        if self.black_captures >= 10 or self.white_captures >= 10 or self.end_of_game():
+            return True
+        return self.detect_five_in_a_row() != EMPTY
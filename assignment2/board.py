@@ -12,7 +12,8 @@ The board uses a 1-dimensional representation with padding
 """
 
 import numpy as np
-from typing import List, Tuple
+import random
+from typing import Dict, List, Tuple
 
 from board_base import (
     board_array_size,
@@ -31,6 +32,235 @@ from board_base import (
     GO_COLOR,
     GO_POINT,
 )
+from zobrist_hash import get_hasher, CODE_MASK
+
+"""
+Value of a won position in staticallyEvaluateForToPlay.
+Heuristic scores of positions that are not over stay well below it.
+"""
+WIN_SCORE = 100000
+
+"""
+Weights of a window of five points that holds 0..5 stones of only one color,
+used by heuristicScore.
+"""
+WINDOW_WEIGHTS = [0, 5, 10, 20, 50, 10000]
+
+
+class BoardGeometry(object):
+    """
+    Geometry of a board size that never changes during a game:
+    the empty board template, all rows, cols and diags,
+    neighbor and capture offsets, and the windows of five for heuristicScore.
+    One instance per size is shared by all boards of that size,
+    see get_geometry.
+    """
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        self.NS: int = size + 1
+        self.maxpoint: int = board_array_size(size)
+        self.empty_board: np.ndarray = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
+        for row in range(1, size + 1):
+            start: int = row * self.NS + 1
+            self.empty_board[start : start + size] = EMPTY
+        self.empty_board.flags.writeable = False
+        # all points on the board, and the position of each in that array
+        self.board_points: np.ndarray = where1d(self.empty_board == EMPTY).astype(GO_POINT)
+        self.board_points.flags.writeable = False
+        self.board_point_index: np.ndarray = np.full(self.maxpoint, -1, dtype=GO_POINT)
+        self.board_point_index[self.board_points] = np.arange(len(self.board_points))
+        self.board_point_index.flags.writeable = False
+        self.neighbor_offsets = (-1, 1, -self.NS, self.NS)
+        self.diag_neighbor_offsets = (-self.NS - 1, -self.NS + 1, self.NS - 1, self.NS + 1)
+        self.capture_offsets = (1, -1, self.NS, -self.NS, self.NS+1, -(self.NS+1), self.NS-1, -self.NS+1)
+        self.rows, self.cols, self.diags = self._calculate_rows_cols_diags()
+        self.lines = self.rows + self.cols + self.diags
+        self.neighbors, self.diag_neighbors, self.capture_rays, self.five_rays = self._calculate_point_tables()
+        self.windows, self.point_windows = self._calculate_windows()
+        self.symmetries, self.inverse_symmetries = self._calculate_symmetries()
+
+    def _walk(self, start: int, step: int) -> Tuple[int, ...]:
+        line = []
+        pt = start
+        while self.empty_board[pt] == EMPTY:
+            line.append(pt)
+            pt += step
+        return tuple(line)
+
+    def _calculate_point_tables(self) -> Tuple[tuple, tuple, tuple, tuple]:
+        """
+        Tables indexed by point, empty for points off the board:
+        - the four neighbors and the four diagonal neighbors
+        - the capture rays, one (stone, stone, bracketing point) triple
+          for each of the eight directions that fits on the board
+        - the five rays, one (forward, backward) pair of point tuples for
+          each of the four lines through the point, up to four points long
+        """
+        def on_board(pt: int) -> bool:
+            return 0 <= pt < self.maxpoint and self.empty_board[pt] == EMPTY
+
+        def ray(pt: int, step: int, length: int) -> Tuple[int, ...]:
+            points = []
+            while len(points) < length and on_board(pt + step):
+                pt += step
+                points.append(pt)
+            return tuple(points)
+
+        neighbors = []
+        diag_neighbors = []
+        capture_rays = []
+        five_rays = []
+        for point in range(self.maxpoint):
+            if not on_board(point):
+                for table in (neighbors, diag_neighbors, capture_rays, five_rays):
+                    table.append(())
+                continue
+            neighbors.append(tuple(point + offset for offset in self.neighbor_offsets))
+            diag_neighbors.append(tuple(point + offset for offset in self.diag_neighbor_offsets))
+            rays = (ray(point, offset, 3) for offset in self.capture_offsets)
+            capture_rays.append(tuple(r for r in rays if len(r) == 3))
+            five_rays.append(tuple((ray(point, step, 4), ray(point, -step, 4))
+                                   for step in (1, self.NS, self.NS + 1, self.NS - 1)))
+        return tuple(neighbors), tuple(diag_neighbors), tuple(capture_rays), tuple(five_rays)
+
+    def _calculate_rows_cols_diags(self) -> Tuple[tuple, tuple, tuple]:
+        if self.size < 5:
+            return (), (), ()
+        # precalculate all rows, cols, and diags for 5-in-a-row detection
+        rows = []
+        cols = []
+        for i in range(1, self.size + 1):
+            rows.append(self._walk(i * self.NS + 1, 1))
+            cols.append(self._walk(self.NS + i, self.NS))
+        diags = []
+        # diag towards SE, starting from first row (1,1) moving right to (1,n)
+        # diag towards SE and NE, starting from (2,1) downwards to (n,1)
+        # diag towards NE, starting from (n,2) moving right to (n,n)
+        first_row = [self.NS + i for i in range(1, self.size + 1)]
+        first_col = [row * self.NS + 1 for row in range(2, self.size + 1)]
+        last_row = [self.size * self.NS + i for i in range(2, self.size + 1)]
+        for start in first_row:
+            diags.append(self._walk(start, self.NS + 1))
+        for start in first_col:
+            diags.append(self._walk(start, self.NS + 1))
+            diags.append(self._walk(start, -self.NS + 1))
+        for start in last_row:
+            diags.append(self._walk(start, -self.NS + 1))
+        diags = [d for d in diags if len(d) >= 5]
+        assert len(rows) == self.size
+        assert len(cols) == self.size
+        assert len(diags) == (2 * (self.size - 5) + 1) * 2
+        return tuple(rows), tuple(cols), tuple(diags)
+
+    def _calculate_windows(self) -> Tuple[tuple, tuple]:
+        """
+        Every window of 5 consecutive points on a row, col or diag,
+        and the windows that pass through each point.
+        """
+        windows = []
+        point_windows = [[] for _ in range(self.maxpoint)]
+        for line in self.lines:
+            for i in range(len(line) - 4):
+                for pt in line[i : i + 5]:
+                    point_windows[pt].append(len(windows))
+                windows.append(line[i : i + 5])
+        return tuple(windows), tuple(tuple(w) for w in point_windows)
+
+    def _calculate_symmetries(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The 8 symmetries of the square board as point permutations:
+        symmetries[t][point] is where point goes under symmetry t and
+        inverse_symmetries[t] maps it back. Symmetry 0 is the identity,
+        points off the board map to themselves.
+        """
+        n = self.size - 1
+        transforms = (
+            lambda i, j: (i, j),
+            lambda i, j: (j, n - i),
+            lambda i, j: (n - i, n - j),
+            lambda i, j: (n - j, i),
+            lambda i, j: (i, n - j),
+            lambda i, j: (n - i, j),
+            lambda i, j: (j, i),
+            lambda i, j: (n - j, n - i),
+        )
+        symmetries = np.tile(np.arange(self.maxpoint, dtype=GO_POINT), (len(transforms), 1))
+        inverse_symmetries = symmetries.copy()
+        for t, transform in enumerate(transforms):
+            for point in self.board_points.tolist():
+                row, col = transform(point // self.NS - 1, point % self.NS - 1)
+                image = coord_to_point(row + 1, col + 1, self.size)
+                symmetries[t][point] = image
+                inverse_symmetries[t][image] = point
+        symmetries.flags.writeable = False
+        inverse_symmetries.flags.writeable = False
+        return symmetries, inverse_symmetries
+
+
+_geometries: Dict[int, BoardGeometry] = {}
+
+def get_geometry(size: int) -> BoardGeometry:
+    """
+    Return the BoardGeometry shared by all boards of the given size.
+    """
+    if size not in _geometries:
+        _geometries[size] = BoardGeometry(size)
+    return _geometries[size]
+
+
+class MoveJournal(object):
+    """
+    Undo journal for make/unmake, stored in one preallocated integer array.
+    Each entry holds the point and color of a move, the capture counts
+    and last moves from before the move, and the stones it captured.
+    The array is allocated once for the longest possible game, so playing
+    and undoing moves does not allocate.
+    """
+    POINT, COLOR, BLACK_CAPTURES, WHITE_CAPTURES, LAST_MOVE, LAST2_MOVE, NUM_CAPTURED = range(7)
+    CAPTURED = 7
+    MAX_CAPTURED = 16    # two stones in each of the eight directions
+
+    def __init__(self, board_size: int) -> None:
+        self.entries: np.ndarray = np.empty((self.max_moves(board_size), self.CAPTURED + self.MAX_CAPTURED),
+                                            dtype=np.int32)
+        self.size: int = 0
+
+    @staticmethod
+    def max_moves(board_size: int) -> int:
+        """
+        Most moves a game can last: one per point, plus one per stone
+        captured before the last move. Both players have captured fewer
+        than 10 stones until then, so that is at most 8 stones each.
+        """
+        return board_size * board_size + 2 * 8
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, point: GO_POINT, color: GO_COLOR, black_captures: int, white_captures: int,
+             last_move: GO_POINT, last2_move: GO_POINT) -> None:
+        if self.size == len(self.entries):
+            # only when moves go on being played after the end of the game
+            self.entries = np.concatenate((self.entries, np.empty_like(self.entries)))
+        self.entries[self.size, : self.CAPTURED] = (point, color, black_captures, white_captures,
+                                                   last_move, last2_move, 0)
+        self.size += 1
+
+    def add_captured(self, point: GO_POINT) -> None:
+        """
+        Record a stone captured by the last pushed move
+        """
+        entry = self.entries[self.size - 1]
+        entry[self.CAPTURED + entry[self.NUM_CAPTURED]] = point
+        entry[self.NUM_CAPTURED] += 1
+
+    def pop(self) -> int:
+        """
+        Remove the last entry and return its row in self.entries, which
+        holds it until the next push. Read its fields with entries.item(row, field).
+        """
+        self.size -= 1
+        return self.size
 
 
 """
@@ -49,10 +279,6 @@ class GoBoard(object):
         """
         assert 2 <= size <= MAXSIZE
         self.reset(size)
-        self.calculate_rows_cols_diags()
-        self.black_captures = 0
-        self.white_captures = 0
-        self.boardStack = []
 
     def add_two_captures(self, color: GO_COLOR) -> None:
         if color == BLACK:
@@ -66,65 +292,53 @@ class GoBoard(object):
         elif color == WHITE:
             return self.white_captures
     
-    def calculate_rows_cols_diags(self) -> None:
-        if self.size < 5:
-            return
-        # precalculate all rows, cols, and diags for 5-in-a-row detection
-        self.rows = []
-        self.cols = []
-        for i in range(1, self.size + 1):
-            current_row = []
-            start = self.row_start(i)
-            for pt in range(start, start + self.size):
-                current_row.append(pt)
-            self.rows.append(current_row)
-            
-            start = self.row_start(1) + i - 1
-            current_col = []
-            for pt in range(start, self.row_start(self.size) + i, self.NS):
-                current_col.append(pt)
-            self.cols.append(current_col)
-        
-        self.diags = []
-        # diag towards SE, starting from first row (1,1) moving right to (1,n)
-        start = self.row_start(1)
-        for i in range(start, start + self.size):
-            diag_SE = []
-            pt = i
-            while self.get_color(pt) == EMPTY:
-                diag_SE.append(pt)
-                pt += self.NS + 1
-            if len(diag_SE) >= 5:
-                self.diags.append(diag_SE)
-        # diag towards SE and NE, starting from (2,1) downwards to (n,1)
-        for i in range(start + self.NS, self.row_start(self.size) + 1, self.NS):
-            diag_SE = []
-            diag_NE = []
-            pt = i
-            while self.get_color(pt) == EMPTY:
-                diag_SE.append(pt)
-                pt += self.NS + 1
-            pt = i
-            while self.get_color(pt) == EMPTY:
-                diag_NE.append(pt)
-                pt += -1 * self.NS + 1
-            if len(diag_SE) >= 5:
-                self.diags.append(diag_SE)
-            if len(diag_NE) >= 5:
-                self.diags.append(diag_NE)
-        # diag towards NE, starting from (n,2) moving right to (n,n)
-        start = self.row_start(self.size) + 1
-        for i in range(start, start + self.size):
-            diag_NE = []
-            pt = i
-            while self.get_color(pt) == EMPTY:
-                diag_NE.append(pt)
-                pt += -1 * self.NS + 1
-            if len(diag_NE) >=5:
-                self.diags.append(diag_NE)
-        assert len(self.rows) == self.size
-        assert len(self.cols) == self.size
-        assert len(self.diags) == (2 * (self.size - 5) + 1) * 2
+    def _set_geometry(self, size: int) -> None:
+        """
+        Reference the shared geometry of the board size
+        and clear the window counts.
+        """
+        self.geometry: BoardGeometry = get_geometry(size)
+        self.maxpoint: int = self.geometry.maxpoint
+        self.rows = self.geometry.rows
+        self.cols = self.geometry.cols
+        self.diags = self.geometry.diags
+        self.windows = self.geometry.windows
+        self.point_windows = self.geometry.point_windows
+        num_windows = len(self.windows)
+        # both indexed by color, window_totals[color][count]
+        self.window_counts = [None, [0] * num_windows, [0] * num_windows]
+        self.window_totals = [None, [num_windows, 0, 0, 0, 0, 0], [num_windows, 0, 0, 0, 0, 0]]
+
+    def _add_to_windows(self, point: GO_POINT, color: GO_COLOR) -> None:
+        opp = opponent(color)
+        counts = self.window_counts[color]
+        opp_counts = self.window_counts[opp]
+        totals = self.window_totals[color]
+        opp_totals = self.window_totals[opp]
+        for w in self.point_windows[point]:
+            count = counts[w]
+            if opp_counts[w] == 0:
+                totals[count] -= 1
+                totals[count + 1] += 1
+            if count == 0:
+                # window is no longer available to the opponent
+                opp_totals[opp_counts[w]] -= 1
+            counts[w] = count + 1
+
+    def _remove_from_windows(self, point: GO_POINT, color: GO_COLOR) -> None:
+        opp = opponent(color)
+        counts = self.window_counts[color]
+        opp_counts = self.window_counts[opp]
+        totals = self.window_totals[color]
+        opp_totals = self.window_totals[opp]
+        for w in self.point_windows[point]:
+            count = counts[w] - 1
+            counts[w] = count
+            if opp_counts[w] == 0:
+                totals[count + 1] -= 1
+                totals[count] += 1
+            if count == 0:
+                opp_totals[opp_counts[w]] += 1
 
     def reset(self, size: int) -> None:
         """
@@ -137,29 +351,100 @@ class GoBoard(object):
         self.last_move: GO_POINT = NO_POINT
         self.last2_move: GO_POINT = NO_POINT
         self.current_player: GO_COLOR = BLACK
-        self.maxpoint: int = board_array_size(size)
-        self.board: np.ndarray[GO_POINT] = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
-        self._initialize_empty_points(self.board)
-        self.calculate_rows_cols_diags()
+        self._set_geometry(size)
+        self.board: np.ndarray[GO_POINT] = self.geometry.empty_board.copy()
+        # set of empty points: dense array of the points, and each point's index in it
+        self.empty_points: np.ndarray[GO_POINT] = self.geometry.board_points.copy()
+        self.empty_index: np.ndarray[GO_POINT] = self.geometry.board_point_index.copy()
+        self.num_empty: int = len(self.empty_points)
         self.black_captures = 0
         self.white_captures = 0
-        self.boardStack = []
+        self.journal = MoveJournal(size)
+        self.hasher = get_hasher(size)
+        self.sym_zarray = self.hasher.symmetricArray(self.geometry.symmetries)
+        # running Zobrist codes of the stones seen through each of the 8 symmetries,
+        # packed into one int, see ZobristHash.symmetricArray. The lowest
+        # 64 bits, symmetry 0, are the code of the board itself.
+        self.code = 0
 
     def copy(self) -> 'GoBoard':
-        b = GoBoard(self.size)
-        assert b.NS == self.NS
-        assert b.WE == self.WE
-        b.ko_recapture = self.ko_recapture
-        b.last_move = self.last_move
-        b.last2_move = self.last2_move
-        b.current_player = self.current_player
-        assert b.maxpoint == self.maxpoint
-        b.board = np.copy(self.board)
+        """
+        Copies the mutable state, the geometry is shared with the copy.
+        """
+        b = GoBoard.__new__(GoBoard)
+        b.__dict__.update(self.__dict__)
+        b.board = self.board.copy()
+        b.empty_points = self.empty_points.copy()
+        b.empty_index = self.empty_index.copy()
+        b.journal = MoveJournal(self.size)
+        b.window_counts = [None, list(self.window_counts[BLACK]), list(self.window_counts[WHITE])]
+        b.window_totals = [None, list(self.window_totals[BLACK]), list(self.window_totals[WHITE])]
         return b
 
     def get_color(self, point: GO_POINT) -> GO_COLOR:
         return self.board[point]
 
+    def get_hash_code(self) -> int:
+        """
+        Zobrist key of the position, covering the stones,
+        the side to move and both capture counters.
+        """
+        return self.hasher.positionCode(self.code & CODE_MASK, self.current_player,
+                                        self.black_captures, self.white_captures)
+
+    def get_child_hash_code(self, point: GO_POINT) -> int:
+        """
+        Zobrist key of the position after current_player plays point.
+        Only a capturing move is played and undone, otherwise the key
+        is computed without touching the board.
+        """
+        color = self.current_player
+        if self.capturePiecesCount(point, color) > 0:
+            self.play_move(point, color)
+            code = self.get_hash_code()
+            self.undoMove()
+            return code
+        return self.hasher.positionCode((self.code & CODE_MASK) ^ self.hasher.zArray[point][color], opponent(color),
+                                        self.black_captures, self.white_captures)
+
+    def _canonical(self, code: int, to_play: GO_COLOR,
+                   black_captures: int, white_captures: int) -> Tuple[int, int]:
+        codes = self.hasher.symmetricCodes(code, to_play, black_captures, white_captures)
+        code = min(codes)
+        return code, codes.index(code)
+
+    def get_canonical_hash_code(self) -> Tuple[int, int]:
+        """
+        Key shared by the up to 8 symmetric versions of the position:
+        the smallest of their Zobrist keys, and the symmetry t that gives it.
+        Point p of this board is canonical_point(p, t) in the canonical
+        position; a move stored for the key is mapped back with point_from_canonical.
+        """
+        return self._canonical(self.code, self.current_player,
+                               self.black_captures, self.white_captures)
+
+    def get_canonical_child_hash_code(self, point: GO_POINT) -> int:
+        """
+        Canonical key of the position after current_player plays point,
+        computed like get_child_hash_code.
+        """
+        color = self.current_player
+        if self.capturePiecesCount(point, color) > 0:
+            self.play_move(point, color)
+            code = self.get_canonical_hash_code()[0]
+            self.undoMove()
+            return code
+        return self._canonical(self.code ^ self.sym_zarray[point][color], opponent(color),
+                               self.black_captures, self.white_captures)[0]
+
+    def canonical_point(self, point: GO_POINT, t: int) -> GO_POINT:
+        """ Where point goes in the position seen through symmetry t """
+        return int(self.geometry.symmetries[t][point])
+
+    def point_from_canonical(self, point: GO_POINT, t: int) -> GO_POINT:
+        """ Inverse of canonical_point """
+        return int(self.geometry.inverse_symmetries[t][point])
+
     def pt(self, row: int, col: int) -> GO_POINT:
         return coord_to_point(row, col, self.size)
 
@@ -205,7 +490,32 @@ class GoBoard(object):
         Return:
             The empty points on the board
         """
-        return where1d(self.board == EMPTY)
+        return np.sort(self.empty_points[:self.num_empty])
+
+    def num_empty_points(self) -> int:
+        return self.num_empty
+
+    def random_empty_point(self) -> GO_POINT:
+        """
+        Return an empty point chosen uniformly at random.
+        """
+        return self.empty_points[random.randrange(self.num_empty)]
+
+    def _remove_empty_point(self, point: GO_POINT) -> None:
+        """
+        Remove point from the empty point set by moving the last
+        empty point into its slot.
+        """
+        i = self.empty_index[point]
+        self.num_empty -= 1
+        last = self.empty_points[self.num_empty]
+        self.empty_points[i] = last
+        self.empty_index[last] = i
+
+    def _add_empty_point(self, point: GO_POINT) -> None:
+        self.empty_points[self.num_empty] = point
+        self.empty_index[point] = self.num_empty
+        self.num_empty += 1
 
     def row_start(self, row: int) -> int:
         assert row >= 1
@@ -314,26 +624,34 @@ class GoBoard(object):
         """
         if self.board[point] != EMPTY:
             return False
-        self.boardStack.append((point,self.board[point]))
+        self.journal.push(point, color, self.black_captures, self.white_captures,
+                          self.last_move, self.last2_move)
         self.board[point] = color
+        self._remove_empty_point(point)
+        sym_zarray = self.sym_zarray
+        self.code ^= sym_zarray[point][color]
+        self._add_to_windows(point, color)
         self.current_player = opponent(color)
         self.last2_move = self.last_move
         self.last_move = point
         O = opponent(color)
         
-        offsets = [1, -1, self.NS, -self.NS, self.NS+1, -(self.NS+1), self.NS-1, -self.NS+1]
-        for offset in offsets:
-            if self.board[point+offset] == O and self.board[point+(offset*2)] == O and self.board[point+(offset*3)] == color:
-                self.boardStack.append((point+offset,self.board[point+offset]))
-                self.boardStack.append((point+(offset*2),self.board[point+(offset*2)]))
-                self.board[point+offset] = EMPTY
-                self.board[point+(offset*2)] = EMPTY
+        board = self.board
+        for p1, p2, end in self.geometry.capture_rays[point]:
+            if board[p1] == O and board[p2] == O and board[end] == color:
+                self.journal.add_captured(p1)
+                self.journal.add_captured(p2)
+                board[p1] = EMPTY
+                board[p2] = EMPTY
+                self._add_empty_point(p1)
+                self._add_empty_point(p2)
+                self.code ^= sym_zarray[p1][O] ^ sym_zarray[p2][O]
+                self._remove_from_windows(p1, O)
+                self._remove_from_windows(p2, O)
                 if color == BLACK:
                     self.black_captures += 2
                 else:
                     self.white_captures += 2
-        #Need to tweak later for previous scores.
-        self.boardStack.append("Marker")
         return True
     
     def neighbors_of_color(self, point: GO_POINT, color: GO_COLOR) -> List:
@@ -344,16 +662,13 @@ class GoBoard(object):
                 nbc.append(nb)
         return nbc
 
-    def _neighbors(self, point: GO_POINT) -> List:
-        """ List of all four neighbors of the point """
-        return [point - 1, point + 1, point - self.NS, point + self.NS]
+    def _neighbors(self, point: GO_POINT) -> Tuple:
+        """ All four neighbors of the point """
+        return self.geometry.neighbors[point]
 
-    def _diag_neighbors(self, point: GO_POINT) -> List:
-        """ List of all four diagonal neighbors of point """
-        return [point - self.NS - 1,
-                point - self.NS + 1,
-                point + self.NS - 1,
-                point + self.NS + 1]
+    def _diag_neighbors(self, point: GO_POINT) -> Tuple:
+        """ All four diagonal neighbors of point """
+        return self.geometry.diag_neighbors[point]
 
     def last_board_moves(self) -> List:
         """
@@ -372,18 +687,10 @@ class GoBoard(object):
         Returns BLACK or WHITE if any five in a row is detected for the color
         EMPTY otherwise.
         """
-        for r in self.rows:
-            result = self.has_five_in_list(r)
-            if result != EMPTY:
-                return result
-        for c in self.cols:
-            result = self.has_five_in_list(c)
-            if result != EMPTY:
-                return result
-        for d in self.diags:
-            result = self.has_five_in_list(d)
-            if result != EMPTY:
-                return result
+        if self.window_totals[BLACK][5] > 0:
+            return BLACK
+        if self.window_totals[WHITE][5] > 0:
+            return WHITE
         return EMPTY
 
     def has_five_in_list(self, list) -> GO_COLOR:
@@ -403,29 +710,96 @@ class GoBoard(object):
                 return prev
         return EMPTY
     
-    def undoMove(self):
-        if self.boardStack != [] and self.boardStack[-1] == "Marker":
-            self.boardStack.pop()
-        scoreCount = -1
-        while(self.boardStack != [] and self.boardStack[-1] != "Marker"):
-            scoreCount += 1
-            point, pColor = self.boardStack.pop()
-
-            self.board[point] = pColor
-            self.current_player = opponent(self.current_player)
-        if scoreCount >= 2:
-            if self.current_player == BLACK:
-                self.black_captures -= scoreCount
-            elif self.current_player == WHITE:
-                self.white_captures -= scoreCount
+    def undoMove(self) -> None:
+        """
+        Takes back the last move played, with the stones it captured.
+        """
+        if len(self.journal) == 0:
+            return
+        row = self.journal.pop()
+        item = self.journal.entries.item
+        point = item(row, MoveJournal.POINT)
+        color = item(row, MoveJournal.COLOR)
+        self.black_captures = item(row, MoveJournal.BLACK_CAPTURES)
+        self.white_captures = item(row, MoveJournal.WHITE_CAPTURES)
+        self.last_move = item(row, MoveJournal.LAST_MOVE)
+        self.last2_move = item(row, MoveJournal.LAST2_MOVE)
+        num_captured = item(row, MoveJournal.NUM_CAPTURED)
+        O = opponent(color)
+        sym_zarray = self.sym_zarray
+        self.board[point] = EMPTY
+        self._add_empty_point(point)
+        self.code ^= sym_zarray[point][color]
+        self._remove_from_windows(point, color)
+        for i in range(MoveJournal.CAPTURED, MoveJournal.CAPTURED + num_captured):
+            p = item(row, i)
+            self.board[p] = O
+            self._remove_empty_point(p)
+            self.code ^= sym_zarray[p][O]
+            self._add_to_windows(p, O)
+        self.current_player = color
     
     def endOfGame(self):
-        if self.get_empty_points().size == 0 or self.detect_five_in_a_row() != EMPTY:
+        if self.num_empty_points() == 0 or self.detect_five_in_a_row() != EMPTY:
             return True
         if self.black_captures >= 10 or self.white_captures >= 10 or self.end_of_game():
             return True
         return False
     
+    def capturePiecesCount(self, point: GO_POINT, color: GO_COLOR) -> int:
+        """
+        Number of opponent stones that color would capture by playing on point.
+        """
+        board = self.board
+        opp = opponent(color)
+        count = 0
+        for p1, p2, end in self.geometry.capture_rays[point]:
+            if board[p1] == opp and board[p2] == opp and board[end] == color:
+                count += 2
+        return count
+
+    def checkWin(self, player: GO_COLOR) -> List[GO_POINT]:
+        """
+        All moves that win directly for player, by completing five in a row
+        or by capturing the 10th stone. [] if there are none.
+        """
+        winning_moves = []
+        if self.window_totals[player][4] > 0:
+            counts = self.window_counts[player]
+            opp_counts = self.window_counts[opponent(player)]
+            for w, window in enumerate(self.windows):
+                if counts[w] == 4 and opp_counts[w] == 0:
+                    for point in window:
+                        if self.get_color(point) == EMPTY and point not in winning_moves:
+                            winning_moves.append(point)
+        captures = self.get_captures(player)
+        for move in self.get_empty_points().tolist():
+            if move not in winning_moves and captures + self.capturePiecesCount(move, player) >= 10:
+                winning_moves.append(move)
+        return winning_moves
+
+    def checkBlockWin(self, player: GO_COLOR) -> List[GO_POINT]:
+        """
+        If the opponent can win directly, return all moves for player after
+        which the opponent has no direct win left, [] otherwise.
+        Only the opponent's winning points and capturing moves can block.
+        """
+        opp = opponent(player)
+        winning_moves = self.checkWin(opp)
+        if not winning_moves:
+            return []
+        candidates = list(winning_moves)
+        for move in self.get_empty_points().tolist():
+            if move not in candidates and self.capturePiecesCount(move, player) > 0:
+                candidates.append(move)
+        blocking_moves = []
+        for move in candidates:
+            self.play_move(move, player)
+            if not self.checkWin(opp):
+                blocking_moves.append(move)
+            self.undoMove()
+        return blocking_moves
+
     def moveOrdering(self, move):
         score = 0
         self.play_move(move, self.current_player)
@@ -438,25 +812,30 @@ class GoBoard(object):
         assert win_color != self.current_player
 
         if win_color != EMPTY:
-            return -100000
+            return -WIN_SCORE
         elif self.current_player == WHITE:
             if self.black_captures >= 10:
-                return -100000
+                return -WIN_SCORE
         elif self.current_player == BLACK:
             if self.white_captures >= 10:
-                return -100000
+                return -WIN_SCORE
+        if self.num_empty_points() == 0:
+            return 0
         return self.heuristicScore()
     
     def heuristicScore(self):
-        opp = opponent(self.current_player)
-        playersInARow = self.detectNumInList()
-        white = playersInARow[0]
-        black = playersInARow[1]
-        
-        score = 10000 * white.get(5, 0) + 50 * white.get(4, 0) + 20 * white.get(3, 0) + 10 * white.get(2, 0) + 5 * white.get(1, 0) \
-              - 10000 * black.get(5, 0) - 50 * black.get(4, 0) - 20 * black.get(3, 0) - 10 * black.get(2, 0) - 5 * black.get(1, 0)
-        
-        if opp == BLACK:
+        """
+        Score for the player to move, from the running window totals.
+        Each window of five points that holds only stones of one color
+        counts for that color, weighted by its number of stones.
+        """
+        white = self.window_totals[WHITE]
+        black = self.window_totals[BLACK]
+        score = 0
+        for count in range(1, 6):
+            score += WINDOW_WEIGHTS[count] * (white[count] - black[count])
+
+        if self.current_player == BLACK:
             return -score
         return score
     
@@ -468,40 +847,16 @@ class GoBoard(object):
         for r in self.rows:
             inARows.append(self.detectNumInList(r))
     
-    def detectNumInList(self) -> dict:
+    def detectNumInList(self) -> List[dict]:
         """
-        Returns the number of in-a-rows
-        TODO: special case 4 . 4 then place in middle will have num[9]
+        Returns the number of in-a-rows for white and black,
+        as dicts from number of stones to number of windows of five
+        that hold only stones of that color.
         """
         playersInARows = [dict(), dict()] # white, black
-        lines = self.rows + self.cols + self.diags
-
-        for line in lines:
-            i = 0
-            whiteCount = 0
-            blackCount = 0
-            for j in range(i, i+5):
-                if i >= len(line) - 5:
-                    break
-                pt = line[j]
-                if pt == BLACK:
-                    if whiteCount != 0 and line[i-1] == EMPTY:
-                        playersInARows[0][whiteCount] = playersInARows[0][whiteCount].get(whiteCount, 0) + 1
-                        i += whiteCount
-                        continue
-                    blackCount += 1
-                elif pt == WHITE:
-                    if blackCount != 0 and line[i-1] == EMPTY:
-                        playersInARows[1][blackCount] = playersInARows[1][blackCount].get(blackCount, 0) + 1
-                        continue
-                    whiteCount += 1
-                elif pt == EMPTY:
-                    if blackCount != 0:
-                        playersInARows[0][whiteCount] = playersInARows[0][whiteCount].get(whiteCount, 0) + 1
-                        i += whiteCount
-                        continue
-                    elif whiteCount != 0:
-                        playersInARows[1][blackCount] = playersInARows[1][blackCount].get(blackCount, 0) + 1
-                        i += blackCount
-                        continue
-        return playersInARows
\ No newline at end of file
+        for count in range(1, 6):
+            if self.window_totals[WHITE][count] > 0:
+                playersInARows[0][count] = self.window_totals[WHITE][count]
+            if self.window_totals[BLACK][count] > 0:
+                playersInARows[1][count] = self.window_totals[BLACK][count]
+        return playersInARows
@@ -10,18 +10,20 @@ at the University of Edinburgh.
 """
 import traceback
 import numpy as np
+import queue
 import re
+import threading
 from sys import stdin, stdout, stderr
 from typing import Any, Callable, Dict, List, Tuple
 
 # solver
-from transposition_table import TranspositionTable
-from zobrist_hash import ZobristHash
-from solver import call_alphabetaDL
+from solver import iterativeDeepening
+from threat_search import ThreatSearch
+from proof_number_search import ProofNumberSearch
+from transposition_table import TranspositionTable, DEFAULT_SIZE_MB
 
 # timelimit
-from sig_handler import timeout_handler
-import signal
+from search_control import SearchControl
 
 from board_base import (
     BLACK,
@@ -34,7 +36,7 @@ from board_base import (
     coord_to_point,
     opponent
 )
-from board import GoBoard
+from board import GoBoard, WIN_SCORE
 from board_util import GoBoardUtil
 from engine import GoEngine
 
@@ -53,14 +55,15 @@ class GtpConnection:
         self._debug_mode: bool = debug_mode
         self.go_engine = go_engine
         self.board: GoBoard = board
-        self.hasher = ZobristHash(self.board.size)
 
-        # set signalrm
+        # time limit of genmove and solve, enforced by the searches polling self.control
         self.timelimit = 1
-        signal.signal(signal.SIGALRM, timeout_handler)
+        self.control = SearchControl()
 
         # set alpha beta iterating deepening depth
         self.alphabeta_depth = self.timelimit * 6
+        self.tt_size = DEFAULT_SIZE_MB    # transposition table size in MB
+        self.tt = TranspositionTable(self.tt_size)    # kept from move to move within a game
 
         self.commands: Dict[str, Callable[[List[str]], None]] = {
             "protocol_version": self.protocol_version_cmd,
@@ -86,6 +89,8 @@ class GtpConnection:
             "gogui-analyze_commands": self.gogui_analyze_cmd,
             "timelimit": self.timelimit_cmd,
             "solve": self.solve_cmd,
+            "ttsize": self.ttsize_cmd,
+            "stop": self.stop_cmd,
             "undoMove": self.undoMove
         }
 
@@ -99,6 +104,7 @@ class GtpConnection:
             "genmove": (1, "Usage: genmove {w,b}"),
             "play": (2, "Usage: play {b,w} MOVE"),
             "legal_moves": (1, "Usage: legal_moves {w,b}"),
+            "ttsize": (1, "Usage: ttsize MB"),
         }
 
     def write(self, data: str) -> None:
@@ -111,11 +117,29 @@ class GtpConnection:
         """
         Start a GTP connection. 
         This function continuously monitors standard input for commands.
+        A separate thread reads the input, so that a stop command ends a
+        running search at once; commands are still executed in order.
         """
-        line = stdin.readline()
+        lines: queue.Queue = queue.Queue()
+        threading.Thread(target=self.read_commands, args=(lines,), daemon=True).start()
+        line = lines.get()
         while line:
             self.get_cmd(line)
+            line = lines.get()
+
+    def read_commands(self, lines: queue.Queue) -> None:
+        """
+        Pass every line of standard input on to the connection,
+        stopping the current search as soon as a stop command is read.
+        An empty line marks the end of the input.
+        """
+        line = stdin.readline()
+        while line:
+            if re.sub("^\d+", "", line).split()[:1] == ["stop"]:
+                self.control.stop()
+            lines.put(line)
             line = stdin.readline()
+        lines.put("")
 
     def get_cmd(self, command: str) -> None:
         """
@@ -179,7 +203,7 @@ class GtpConnection:
         Reset the board to empty board of given size
         """
         self.board.reset(size)
-        self.hasher = ZobristHash(size)
+        self.tt.clear()
 
     def board2d(self) -> str:
         return str(GoBoardUtil.get_twoD_board(self.board))
@@ -398,25 +422,27 @@ class GtpConnection:
             return
 
         value = -1
+        move = None
         root = self.board.copy()
-        tt = TranspositionTable()
-
-        # gen move with solver
-        try: 
-            signal.alarm(self.timelimit)    # set timelimit alarm
-            value, move = call_alphabetaDL(root, self.alphabeta_depth, tt, self.hasher)
-        except TimeoutError:
-            # generate random move if reached timelimit
-            is_random = True
+
+        # look for a win by threats first, then gen move with solver,
+        # keeping the result of the last completed depth
+        self.control.start(self.timelimit)
+        threat_move = ThreatSearch(control=self.control).solve(root)
+        if threat_move is not None:
+            value, move = WIN_SCORE, threat_move
         else:
-            signal.alarm(0)    # disable timelimit alarm
+            self.tt.newSearch()
+            for depth, value, move in iterativeDeepening(root, self.alphabeta_depth, self.tt,
+                                                         control=self.control):
+                pass
 
         # generate random move if toPlay is losing
-        if value < 0:
+        if value <= -WIN_SCORE:
             is_random = True
         
-        # generate random move if toPlay is losing or timelimit exceeded
-        if is_random:
+        # generate random move if toPlay is losing or no depth was completed in time
+        if is_random or move is None:
             rng = np.random.default_rng()
             choice = rng.choice(len(legal_moves))
             move = legal_moves[choice]
@@ -438,36 +464,61 @@ class GtpConnection:
 
         self.respond()
 
+    def ttsize_cmd(self, args: List[str]) -> None:
+        """ Set the size of the transposition table in MB """
+        try:
+            size = int(args[0])
+            assert 1 <= size <= 512
+        except (ValueError, AssertionError):
+            self.error("ttsize must be an integer between 1 and 512")
+            return
+        self.tt_size = size
+        self.tt = TranspositionTable(size)
+        self.respond()
+
     def solve_cmd(self, args: List[str]) -> None:
         """ Implement this function for Assignment 2 """
         root = self.board.copy()
-        tt = TranspositionTable()
         
-        try: 
-            signal.alarm(self.timelimit)    # set timelimit alarm
-            value, move = call_alphabetaDL(root, self.alphabeta_depth, tt, self.hasher)
-        except TimeoutError:
+        self.control.start(self.timelimit)
+        threat_move = ThreatSearch(control=self.control).solve(root)
+        if threat_move is not None:
+            result = root.current_player, threat_move
+        else:
+            result = ProofNumberSearch(self.tt_size, self.control).solve(root)
+        if result is None:
+            # out of time, or stopped
             self.respond("unknown")
+            return
+        winner, move = result
+        winner_as_string = "b" if winner == BLACK else "w"
+        if winner != root.current_player and winner != EMPTY:
+            # loss, no move to give
+            self.respond(winner_as_string)
+            return
+        if move is None:
+            # only a game already over in a draw comes without a move
+            self.respond("draw" if winner == EMPTY else "unknown")
+            return
+        move_coord = point_to_coord(move, self.board.size)
+        move_as_string = format_point(move_coord)
+        move_as_string = move_as_string.lower()
+        if winner == EMPTY:
+            # proven that no one can force a win
+            self.respond("draw {}".format(move_as_string))
         else:
-            signal.alarm(0)    # disable timelimit alarm
-            move_coord = point_to_coord(move, self.board.size)
-            move_as_string = format_point(move_coord)
-            move_as_string = move_as_string.lower()
-            if value == 0:
-                # draw
-                self.respond("draw {}".format(move_as_string))
-            if value > 0:
-                # win
-                if root.current_player == BLACK:
-                    self.respond("b {}".format(move_as_string))
-                if root.current_player == WHITE:
-                    self.respond("w {}".format(move_as_string))
-            elif value < 0:
-                opp = opponent(root.current_player)
-                if opp == BLACK:
-                    self.respond('b')
-                if opp == WHITE:
-                    self.respond('w')
+            self.respond("{} {}".format(winner_as_string, move_as_string))
+
+    def stop_cmd(self, args: List[str]) -> None:
+        """
+        Stop the running search; it ends at its next check and answers
+        with what it has. The stop itself happens in read_commands, when
+        the command is read, and is kept pending in case the search it is
+        meant for had not started yet. Every command read before this one
+        has run by now, so the pending stop is dropped here.
+        """
+        self.control.clearStop()
+        self.respond()
 
     def undoMove(self, args: List[str]) -> None:
         self.board.undoMove()
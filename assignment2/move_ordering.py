@@ -0,0 +1,49 @@
+import numpy as np
+
+class MoveOrdering(object):
+    """
+    Cheap move ordering for alphabeta search, without playing any move:
+    the hash move first, then the two killer moves of the ply, then all
+    other moves by their history score.
+    A move that causes a beta cutoff becomes a killer at its ply, and its
+    history score for the color that played it grows with the depth
+    that was searched below it.
+    """
+
+    def __init__(self, maxpoint, maxPly):
+        self.killers = [[None, None] for _ in range(maxPly + 1)]
+        # history[color][point], indexed by color like the board
+        self.history = np.zeros((3, maxpoint), dtype=np.int64)
+
+    def order(self, moves, color, ply, hashMove=None):
+        """
+        Return the moves as a list, in the order they should be searched
+        """
+        moves = np.asarray(moves)
+        # stable sort keeps the given order among moves without history
+        ordered = moves[np.argsort(-self.history[color][moves], kind="stable")].tolist()
+        first = [hashMove] + self.plyKillers(ply)
+        for move in reversed(first):
+            if move is not None and move in ordered:
+                ordered.remove(move)
+                ordered.insert(0, move)
+        return ordered
+
+    def plyKillers(self, ply):
+        """
+        Killer moves of ply; captures free points, so a search can go
+        deeper than the number of empty points it was sized for
+        """
+        while ply >= len(self.killers):
+            self.killers.append([None, None])
+        return self.killers[ply]
+
+    def cutoff(self, move, color, ply, depth):
+        """
+        Record that move caused a beta cutoff at ply, with depth left to search
+        """
+        killers = self.plyKillers(ply)
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = int(move)
+        self.history[color][move] += depth * depth
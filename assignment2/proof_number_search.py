@@ -0,0 +1,238 @@
+import numpy as np
+from board import GoBoard
+from board_base import opponent, BLACK, WHITE, EMPTY
+from search_control import SearchControl
+
+"""
+Proof and disproof numbers at or above INFINITY mean proven or disproven.
+"""
+INFINITY = 10**9
+
+"""
+Threshold slack of the 1+epsilon trick, epsilon = 1 / EPSILON_DIVISOR
+"""
+EPSILON_DIVISOR = 4
+
+"""
+Bytes per entry: key, phi and delta.
+"""
+ENTRY_BYTES = 8 + 4 + 4
+DEFAULT_SIZE_MB = 64
+
+class ProofTable(object):
+    """
+    Fixed-size table of (phi, delta) pairs in parallel NumPy arrays,
+    indexed by the low bits of the Zobrist code like TranspositionTable.
+    Buckets of two slots: the first one keeps solved positions, it is only
+    replaced by another solved position or when it holds an unsolved one;
+    the second slot always takes what the first one turns down.
+    """
+
+    def __init__(self, sizeMB=DEFAULT_SIZE_MB):
+        numBuckets = 1
+        while numBuckets * 4 * ENTRY_BYTES <= sizeMB * 2**20:
+            numBuckets *= 2
+        self.mask = numBuckets - 1
+        numEntries = 2 * numBuckets
+        self.keys = np.zeros(numEntries, dtype=np.uint64)
+        self.phis = np.zeros(numEntries, dtype=np.int32)
+        self.deltas = np.zeros(numEntries, dtype=np.int32)    # 0 in both marks an empty slot
+
+    def clear(self):
+        self.phis.fill(0)
+        self.deltas.fill(0)
+
+    def lookup(self, code):
+        """
+        (phi, delta) stored for code, (1, 1) for a position not in the table
+        """
+        slot = (code & self.mask) << 1
+        for slot in (slot, slot + 1):
+            if self.keys[slot] == code and (self.phis[slot] != 0 or self.deltas[slot] != 0):
+                return int(self.phis[slot]), int(self.deltas[slot])
+        return 1, 1
+
+    def store(self, code, phi, delta):
+        slot = (code & self.mask) << 1
+        solved = phi == 0 or delta == 0
+        oldSolved = self.phis[slot] == 0 or self.deltas[slot] == 0
+        empty = self.phis[slot] == 0 and self.deltas[slot] == 0
+        if self.keys[slot] != code and not empty and oldSolved and not solved:
+            slot += 1
+        self.keys[slot] = code
+        self.phis[slot] = phi
+        self.deltas[slot] = delta
+
+
+class ProofNumberSearch(object):
+    """
+    Depth-first proof-number (df-pn) search, with make/unmake on one board.
+    The table is keyed by canonical codes, so symmetric positions share
+    their proof and disproof numbers.
+    Each search proves or disproves that one attacker color can force a win.
+    Numbers are kept from the view of the player to move: phi is the proof
+    number of that player reaching its goal, delta the disproof number.
+    Then phi(n) = min over children of delta(child), and
+    delta(n) = sum over children of phi(child).
+    """
+
+    def __init__(self, sizeMB=DEFAULT_SIZE_MB, control=None):
+        self.table = ProofTable(sizeMB)
+        self.attacker = BLACK
+        self.control = control if control is not None else SearchControl()
+
+    def solve(self, state):
+        """
+        Returns (winner, move):
+        (toPlay, winning move) if the player to move wins,
+        (opponent, None) if it loses,
+        (EMPTY, a move that keeps the draw) if neither side can force a win,
+        (EMPTY, None) if the game is already over in a draw,
+        None if control stopped the search first.
+        """
+        toPlay = state.current_player
+        wins = state.checkWin(toPlay)
+        if wins:
+            return toPlay, wins[0]
+        proven = self.prove(state, toPlay)
+        if proven is None:
+            return None
+        if proven:
+            move = self.provenMove(state, toPlay, True)
+            return None if move is None else (toPlay, move)
+        proven = self.prove(state, opponent(toPlay))
+        if proven is None:
+            return None
+        if proven:
+            return opponent(toPlay), None
+        # the opponent cannot win: some move leads to a position it cannot win
+        move = self.provenMove(state, opponent(toPlay), False)
+        if move is None and state.get_empty_points().size > 0:
+            return None
+        return EMPTY, move
+
+    def prove(self, state, attacker):
+        """
+        Return whether attacker can force a win from state,
+        None if control stopped the search first
+        """
+        self.table.clear()
+        self.attacker = attacker
+        code = state.get_canonical_hash_code()[0]
+        phi, delta = self.table.lookup(code)
+        while phi != 0 and delta != 0:
+            self.mid(state, INFINITY, INFINITY)
+            if self.control.stopped:
+                return None
+            phi, delta = self.table.lookup(code)
+        attackerToPlay = state.current_player == attacker
+        return (phi == 0) == attackerToPlay
+
+    def solvedChild(self, state, solved):
+        for move in state.get_empty_points().tolist():
+            phi, delta = self.table.lookup(state.get_canonical_child_hash_code(move))
+            if solved(phi, delta):
+                return move
+        return None
+
+    def provenMove(self, state, attacker, proven):
+        """
+        A move of the player to move after which prove(state, attacker) is
+        proven, right after that was shown for state itself.
+        The children are read from the table first; when their entries have
+        been replaced, each child is proved again, starting with the children
+        missing from the table, since the one sought was replaced.
+        None if there is no move, or if control stopped the search.
+        """
+        move = self.solvedChild(state, lambda phi, delta: delta == 0)
+        if move is not None:
+            return move
+        color = state.current_player
+        moves = state.get_empty_points().tolist()
+        moves.sort(key=lambda move: self.table.lookup(state.get_canonical_child_hash_code(move)) != (1, 1))
+        for move in moves:
+            state.play_move(move, color)
+            result = self.prove(state, attacker)
+            state.undoMove()
+            if result is None:
+                return None
+            if result == proven:
+                return move
+        return None
+
+    def expand(self, state, code):
+        """
+        Moves to search from state, or None if state is decided without
+        search, in which case its numbers are stored in the table.
+        The player to move reaches its goal if it can win at once, and fails
+        if the opponent can win at once and no move blocks every such win;
+        otherwise only the blocking moves are worth searching.
+        At the end of the game the attacker reaches its goal only by winning.
+        """
+        toPlay = state.current_player
+        if state.endOfGame():
+            winner = state.detect_five_in_a_row()
+            if winner == EMPTY:
+                if state.black_captures >= 10:
+                    winner = BLACK
+                elif state.white_captures >= 10:
+                    winner = WHITE
+            if (winner == self.attacker) == (toPlay == self.attacker):
+                self.table.store(code, 0, INFINITY)
+            else:
+                self.table.store(code, INFINITY, 0)
+            return None
+        if state.checkWin(toPlay):
+            self.table.store(code, 0, INFINITY)
+            return None
+        if state.checkWin(opponent(toPlay)):
+            moves = state.checkBlockWin(toPlay)
+            if not moves:
+                self.table.store(code, INFINITY, 0)
+                return None
+            return moves
+        return state.get_empty_points().tolist()
+
+    def mid(self, state, thPhi, thDelta):
+        """
+        Search below state until its phi reaches thPhi or its delta reaches
+        thDelta, then store its numbers in the table.
+        Once control stops the search, it returns without storing.
+        """
+        if self.control.tick():
+            return
+        code = state.get_canonical_hash_code()[0]
+        moves = self.expand(state, code)
+        if moves is None:
+            return
+        color = state.current_player
+        codes = [state.get_canonical_child_hash_code(move) for move in moves]
+
+        while True:
+            # phi is the smallest child delta, delta the sum of child phis
+            phi = INFINITY
+            delta = 0
+            delta2 = INFINITY
+            best = 0
+            bestPhi = 0
+            for i, childCode in enumerate(codes):
+                childPhi, childDelta = self.table.lookup(childCode)
+                delta = min(delta + childPhi, INFINITY)
+                if childDelta < phi:
+                    delta2 = phi
+                    phi = childDelta
+                    best = i
+                    bestPhi = childPhi
+                elif childDelta < delta2:
+                    delta2 = childDelta
+            if phi >= thPhi or delta >= thDelta:
+                self.table.store(code, phi, delta)
+                return
+            # 1+epsilon trick: let the best child run a little past the second
+            # best one, so the search does not switch back and forth between them
+            childThDelta = min(thPhi, delta2 + 1 + delta2 // EPSILON_DIVISOR)
+            state.play_move(moves[best], color)
+            self.mid(state, min(thDelta - delta + bestPhi, INFINITY), childThDelta)
+            state.undoMove()
+            if self.control.stopped:
+                return
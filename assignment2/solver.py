@@ -1,40 +1,126 @@
-from board import GoBoard
-from transposition_table import TranspositionTable
-from zobrist_hash import ZobristHash
+from board import GoBoard, WIN_SCORE
+from transposition_table import TranspositionTable, EXACT, LOWER, UPPER
+from move_ordering import MoveOrdering
+from search_control import SearchControl
 INFINITY = 1000000
 
-def storeResult(tt, code, result):
-    tt.store(code, result)
+"""
+Half width of the aspiration window of iterativeDeepening,
+the weight of one window of four (see WINDOW_WEIGHTS).
+"""
+ASPIRATION_WINDOW = 50
+
+def storeResult(tt, code, symmetry, state, result, depth, bound):
+    move = result[1]
+    if move is not None:
+        move = state.canonical_point(move, symmetry)
+    tt.store(code, result[0], move, depth, bound)
     return result
 
-def alphabetaDL(state, alpha, beta, depth, tt, hasher):
-    code = hasher.computeHash(state)
-    result = tt.lookup(code)
-    if result != None:
-        return result
+def alphabetaDL(state, alpha, beta, depth, tt, ordering, control, ply=0, pvs=False):
+    """
+    Depth-limited alphabeta in negamax form, ply moves below the root.
+    Once control stops the search, every node returns at once without
+    storing anything, and the result is meaningless.
+    With pvs, principal variation search: only the first move gets the
+    full window, every later one is scouted with a null window and searched
+    again with the full window only if it turns out better than alpha.
+    A table entry ends the search only if it comes from a search at least
+    as deep and its bound decides the current window; otherwise its move
+    is tried first, see MoveOrdering.
+    The table is keyed by canonical codes, so symmetric positions share
+    entries; moves are stored as seen in the canonical position.
+    """
+    if control.tick():
+        return (0, None)
+    code, symmetry = state.get_canonical_hash_code()
+    hashMove = None
+    slot = tt.probe(code)
+    if slot >= 0:
+        value = int(tt.values[slot])
+        bound = tt.bounds[slot]
+        move = state.point_from_canonical(tt.moves[slot], symmetry) if tt.moves[slot] >= 0 else None
+        if tt.depths[slot] >= depth:
+            if bound == EXACT \
+                    or (bound == LOWER and value >= beta) \
+                    or (bound == UPPER and value <= alpha):
+                return (value, move)
+        hashMove = move
 
     if state.endOfGame() or depth == 0:
         result = (state.staticallyEvaluateForToPlay(), None)
-        return storeResult(tt, code, result)
+        return storeResult(tt, code, symmetry, state, result, depth, EXACT)
 
-    legalMoves = state.get_empty_points()
-    sortedLegal = sorted(legalMoves, key=state.moveOrdering, reverse=True)
+    color = state.current_player
+    sortedLegal = ordering.order(state.get_empty_points(), color, ply, hashMove)
     bestMove = sortedLegal[0]
+    alphaOrig = alpha
 
-    for move in sortedLegal:
-        state.play_move(move, state.current_player)
-        value, mv = alphabetaDL(state, -beta, -alpha, depth - 1, tt, hasher)
-        value = -value
+    for i, move in enumerate(sortedLegal):
+        state.play_move(move, color)
+        if pvs and i > 0:
+            value = -alphabetaDL(state, -alpha - 1, -alpha, depth - 1, tt, ordering, control, ply + 1, pvs)[0]
+            if alpha < value < beta and not control.stopped:
+                value = -alphabetaDL(state, -beta, -alpha, depth - 1, tt, ordering, control, ply + 1, pvs)[0]
+        else:
+            value = -alphabetaDL(state, -beta, -alpha, depth - 1, tt, ordering, control, ply + 1, pvs)[0]
+        if control.stopped:
+            state.undoMove()
+            return (0, None)
         if value > alpha:
             alpha = value
             bestMove = move
         state.undoMove()
         if value >= beta:
+            ordering.cutoff(move, color, ply, depth)
             result = (beta, bestMove)
-            return storeResult(tt, code, result)
+            return storeResult(tt, code, symmetry, state, result, depth, LOWER)
 
     result = (alpha, bestMove)
-    return storeResult(tt, code, result)
+    return storeResult(tt, code, symmetry, state, result, depth, EXACT if alpha > alphaOrig else UPPER)
+
+def call_alphabetaDL(rootState, depth, tt, ordering=None, alpha=-INFINITY, beta=INFINITY, pvs=False,
+                     control=None):
+    if ordering is None:
+        ordering = MoveOrdering(rootState.maxpoint, depth)
+    if control is None:
+        control = SearchControl()
+    return alphabetaDL(rootState, alpha, beta, depth, tt, ordering, control, pvs=pvs)
 
-def call_alphabetaDL(rootState, depth, tt, hasher):
-    return alphabetaDL(rootState, -INFINITY, INFINITY, depth, tt, hasher)
\ No newline at end of file
+def iterativeDeepening(rootState, maxDepth, tt=None, pvs=False, control=None):
+    """
+    Searches rootState to depth 1, 2, ..., maxDepth and yields
+    (depth, value, move) after each completed depth, so the caller always
+    holds the result of the last completed depth if the search is interrupted.
+    All iterations share one table and one MoveOrdering, so each one is
+    ordered by the best moves, killers and history of the previous ones,
+    and reuses their results where deep enough.
+    Stops early once the value is a proven win or loss, or the depth
+    reaches the number of empty points.
+    With pvs, each depth uses principal variation search and starts from
+    an aspiration window of ASPIRATION_WINDOW around the value of two depths
+    before: values swing between odd and even depths, so that is closer
+    than the last one. If the value falls outside, that depth is searched
+    again with the full window.
+    When control stops the search, the interrupted depth is not yielded.
+    """
+    if tt is None:
+        tt = TranspositionTable()
+    if control is None:
+        control = SearchControl()
+    ordering = MoveOrdering(rootState.maxpoint, maxDepth)
+    values = []
+    for depth in range(1, maxDepth + 1):
+        if pvs and len(values) >= 2:
+            alpha, beta = values[-2] - ASPIRATION_WINDOW, values[-2] + ASPIRATION_WINDOW
+            value, move = call_alphabetaDL(rootState, depth, tt, ordering, alpha, beta, pvs, control)
+            if (value <= alpha or value >= beta) and not control.stopped:
+                value, move = call_alphabetaDL(rootState, depth, tt, ordering, pvs=pvs, control=control)
+        else:
+            value, move = call_alphabetaDL(rootState, depth, tt, ordering, pvs=pvs, control=control)
+        if control.stopped:
+            return
+        values.append(value)
+        yield depth, value, move
+        if abs(value) >= WIN_SCORE or depth >= rootState.num_empty_points():
+            return
@@ -0,0 +1,99 @@
+from board import GoBoard
+from board_base import opponent, EMPTY
+from search_control import SearchControl
+
+class ThreatSearch(object):
+    """
+    Threat-space search for a forced win of the player to move.
+    The attacker only plays moves that threaten to win directly, by five
+    in a row or by capturing the 10th stone. The defender only plays the
+    moves that take away every direct win, see GoBoard.checkBlockWin;
+    any other reply loses at once. Since both sides have few moves, this
+    finds long forcing wins far faster than a full-width search.
+    A win it returns is proven. None means no threat sequence was found
+    within maxDepth attacker moves and maxNodes positions, or before
+    control stopped the search.
+    """
+
+    def __init__(self, maxDepth=7, maxNodes=2000, control=None):
+        self.maxDepth = maxDepth
+        self.maxNodes = maxNodes
+        self.control = control if control is not None else SearchControl()
+        self.nodes = 0
+        self.failed = {}    # code -> deepest depth at which the position was not won
+
+    def solve(self, state):
+        """
+        Return a move that wins by threats for state.current_player, or None.
+        Deepens one attacker move at a time, so short wins are found first.
+        """
+        self.nodes = 0
+        attacker = state.current_player
+        for depth in range(1, self.maxDepth + 1):
+            move = self.attack(state, attacker, depth)
+            if move is not None or self.nodes >= self.maxNodes or self.control.stopped:
+                return move
+        return None
+
+    def threatMoves(self, state, attacker):
+        """
+        Moves after which attacker threatens a direct win and the defender
+        has no direct win of its own
+        """
+        defender = opponent(attacker)
+        counts = state.window_counts[attacker]
+        opp_counts = state.window_counts[defender]
+        if state.get_captures(attacker) >= 6:
+            # with 6 or more captures, setting up a capture is a threat
+            candidates = state.get_empty_points().tolist()
+        else:
+            candidates = []
+            if state.window_totals[attacker][3] > 0:
+                for w, window in enumerate(state.windows):
+                    if counts[w] == 3 and opp_counts[w] == 0:
+                        for point in window:
+                            if state.get_color(point) == EMPTY and point not in candidates:
+                                candidates.append(point)
+            for move in state.get_empty_points().tolist():
+                if move not in candidates and state.capturePiecesCount(move, attacker) > 0:
+                    candidates.append(move)
+        threats = []
+        for move in candidates:
+            state.play_move(move, attacker)
+            if state.checkWin(attacker) and not state.checkWin(defender):
+                threats.append(move)
+            state.undoMove()
+        return threats
+
+    def attack(self, state, attacker, depth):
+        """
+        Return a move that wins for attacker, who is to play, within depth
+        threats, or None
+        """
+        wins = state.checkWin(attacker)
+        if wins:
+            return wins[0]
+        code = state.get_hash_code()
+        if depth == 0 or self.failed.get(code, -1) >= depth:
+            return None
+        self.nodes += 1
+        # each attacker node generates and tries every threat, so the
+        # clock is read at every one of them
+        if self.nodes >= self.maxNodes or self.control.tickNow():
+            return None
+        defender = opponent(attacker)
+        for move in self.threatMoves(state, attacker):
+            state.play_move(move, attacker)
+            won = True
+            for reply in state.checkBlockWin(defender):
+                state.play_move(reply, defender)
+                won = self.attack(state, attacker, depth - 1) is not None
+                state.undoMove()
+                if not won:
+                    break
+            state.undoMove()
+            if won:
+                return move
+        if self.nodes < self.maxNodes and not self.control.stopped:
+            self.failed[code] = depth
+        return None
@@ -1,24 +1,91 @@
 import random
+import struct
 from board_base import (
+    board_array_size,
+    BLACK,
+    WHITE,
     BORDER
 )
 
+CODE_MASK = 2**64 - 1
+_unpackCodes = struct.Struct("<8Q").unpack
+
 class ZobristHash:
+    """
+    Random code tables for Zobrist hashing.
+    GoBoard keeps a running code of its stones and XORs entries of these
+    tables in and out as stones are placed, captured and restored.
+    Side to move and both capture counters are mixed in when the full
+    code is read, so that they are covered by the key as well.
+    """
     def __init__(self, boardSize):
-        self.boardSize = boardSize * boardSize
+        self.boardSize = boardSize
+        self.numPoints = board_array_size(boardSize)
+        # one code per point and color, EMPTY and BORDER do not change the code
         self.zArray = []
-        for _ in range(self.boardSize):
-            self.zArray.append([random.getrandbits(64) for _ in range(3)])
+        for _ in range(self.numPoints):
+            self.zArray.append([0, random.getrandbits(64), random.getrandbits(64), 0])
+        self.whiteToPlay = random.getrandbits(64)
+        # one code per capture count and color, indexed by color like zArray
+        self.captureArray = [[0] * self.numPoints]
+        for _ in range(2):
+            self.captureArray.append([random.getrandbits(64) for _ in range(self.numPoints)])
+        self.symArray = None
+
+    def symmetricArray(self, symmetries):
+        """
+        symArray[point][color] packs the codes of a stone of color on point
+        seen through each symmetry t, zArray[symmetries[t][point]][color],
+        into one int at bits 64*t and up. XORing these in as stones change
+        keeps the codes of all symmetric positions at once, one XOR per stone.
+        Built on first use.
+        """
+        if self.symArray is None:
+            self.symArray = []
+            for point in range(self.numPoints):
+                packed = [0, 0, 0, 0]
+                for t, symmetry in enumerate(symmetries):
+                    for color in (BLACK, WHITE):
+                        packed[color] |= self.zArray[int(symmetry[point])][color] << (64 * t)
+                self.symArray.append(packed)
+        return self.symArray
+
+    def symmetricCodes(self, packedCode, toPlay, blackCaptures, whiteCaptures):
+        """
+        Unpack the codes of the 8 symmetric positions and combine each one
+        with side to move and captures, like positionCode
+        """
+        mix = self.positionCode(0, toPlay, blackCaptures, whiteCaptures)
+        return [code ^ mix for code in _unpackCodes(packedCode.to_bytes(64, "little"))]
+
+    def positionCode(self, stonesCode, toPlay, blackCaptures, whiteCaptures):
+        """
+        Combine the running code of the stones with side to move and captures
+        """
+        code = stonesCode ^ self.captureArray[BLACK][blackCaptures % self.numPoints] \
+                          ^ self.captureArray[WHITE][whiteCaptures % self.numPoints]
+        if toPlay == WHITE:
+            code ^= self.whiteToPlay
+        return code
 
-    # Computes the hash value of a given board
+    # Computes the hash value of a given board from scratch
     def computeHash(self, gameState):
-        count = 0 
-        hash = 0
-        for point in gameState.board:
-            if point != BORDER:
-                if count == 0:
-                    hash = self.zArray[count][point]
-                else:
-                    hash = hash ^ self.zArray[count][point]
-                count += 1
-        return hash
\ No newline at end of file
+        stonesCode = 0
+        for point in range(self.numPoints):
+            color = gameState.get_color(point)
+            if color != BORDER:
+                stonesCode ^= self.zArray[point][color]
+        return self.positionCode(stonesCode, gameState.current_player,
+                                 gameState.black_captures, gameState.white_captures)
+
+
+_hashers = {}
+
+def get_hasher(boardSize):
+    """
+    Return the ZobristHash shared by all boards of the given size,
+    so that codes of different boards and searches can be compared.
+    """
+    if boardSize not in _hashers:
+        _hashers[boardSize] = ZobristHash(boardSize)
+    return _hashers[boardSize]
@@ -12,6 +12,8 @@ from board import GoBoard
 from board_util import GoBoardUtil
 from engine import GoEngine
 import random
+import numpy as np
+from batch_playout import simulate_batch
 
 class Go0(GoEngine):
     def __init__(self) -> None:
@@ -72,13 +74,14 @@ class SimulationFlatMC:
         return best
     
     def simulate_move(self, board, move, color):
-        wins = 0
+        """
+        Win rate of color over num_simulations random playouts after move,
+        all played in one batch
+        """
         cboard = board.copy()
         cboard.play_move(move, color)
-        for _ in range(self.num_simulations):
-            winner = cboard.copy().simulate(color)
-            if winner:
-                wins += 1
+        winners = simulate_batch(cboard, color, self.num_simulations)
+        wins = np.count_nonzero(winners == color)
         eval = wins / self.num_simulations
         return eval
 
@@ -113,13 +116,14 @@ class ruleBasedSimulation:
         return best
     
     def simulate_move(self, board, move, color):
-        wins = 0
+        """
+        Win rate of color over num_simulations random playouts after move,
+        all played in one batch
+        """
         cboard = board.copy()
         cboard.play_move(move, color)
-        for _ in range(self.num_simulations):
-            winner = cboard.copy().simulate(color)
-            if winner:
-                wins += 1
+        winners = simulate_batch(cboard, color, self.num_simulations)
+        wins = np.count_nonzero(winners == color)
         eval = wins / self.num_simulations
         return eval
 
@@ -0,0 +1,115 @@
+"""
+batch_playout.py
+Uniformly random playouts of many copies of one position, in lockstep.
+
+The K games are rows of a (K, maxpoint) array and each step plays one
+random move in every game that is not over. Captures and five in a row
+are checked for all games at once, by gathering the board values on
+precomputed ray tables around the points just played.
+"""
+
+import random
+import numpy as np
+from typing import Dict
+
+from board_base import opponent, BLACK, WHITE, EMPTY, BORDER
+
+
+class PlayoutTables(object):
+    """
+    Ray tables of one board size as integer arrays, for vectorized gathers.
+    Rays that do not fit on the board are padded with point 0, which is
+    always BORDER, so a padded ray never matches a capture or a line.
+    - capture_rays[point, direction] = (stone, stone, bracketing point)
+    - five_rays[point, line, side] = the up to four points next to point,
+      forward (side 0) or backward (side 1) along one of the four lines
+    """
+    def __init__(self, geometry) -> None:
+        assert geometry.empty_board[0] == BORDER
+        self.board_points: np.ndarray = geometry.board_points.astype(np.intp)
+        self.capture_rays: np.ndarray = np.zeros((geometry.maxpoint, 8, 3), dtype=np.intp)
+        self.five_rays: np.ndarray = np.zeros((geometry.maxpoint, 4, 2, 4), dtype=np.intp)
+        for point in range(geometry.maxpoint):
+            for d, ray in enumerate(geometry.capture_rays[point]):
+                self.capture_rays[point, d] = ray
+            for line, sides in enumerate(geometry.five_rays[point]):
+                for side, ray in enumerate(sides):
+                    self.five_rays[point, line, side, : len(ray)] = ray
+
+
+_tables: Dict[int, PlayoutTables] = {}
+
+def get_playout_tables(geometry) -> PlayoutTables:
+    if geometry.size not in _tables:
+        _tables[geometry.size] = PlayoutTables(geometry)
+    return _tables[geometry.size]
+
+
+def _winner_of(board) -> int:
+    """
+    Winner of a position that is over, EMPTY for a draw or a game that is not over
+    """
+    winner = board.detect_five_in_a_row()
+    if winner == EMPTY:
+        if board.black_captures >= 10:
+            winner = BLACK
+        elif board.white_captures >= 10:
+            winner = WHITE
+    return winner
+
+
+def simulate_batch(board, color, num_playouts: int, rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Play num_playouts random games from board, like GoBoard.simulate(color):
+    color played last, so each game starts with a move of the opponent.
+    Returns the winner of each game, EMPTY for a draw.
+    """
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+    winners = np.full(num_playouts, EMPTY, dtype=np.int8)
+    if board.endOfGame():
+        winners[:] = _winner_of(board)
+        return winners
+    tables = get_playout_tables(board.geometry)
+    points = tables.board_points
+    boards = np.tile(board.board.astype(np.int8), (num_playouts, 1))
+    captures = np.zeros((num_playouts, 3), dtype=np.int32)    # indexed by color
+    captures[:, BLACK] = board.black_captures
+    captures[:, WHITE] = board.white_captures
+    num_empty = np.full(num_playouts, board.num_empty_points(), dtype=np.int32)
+    # boards, captures and num_empty only keep the games still going, ids maps them to winners
+    ids = np.arange(num_playouts)
+    to_play = color
+    while len(ids) > 0:
+        to_play = opponent(to_play)
+        O = opponent(to_play)
+        rows = np.arange(len(ids))
+        # a uniformly random empty point in each game: smallest random key
+        keys = rng.random((len(ids), len(points)))
+        keys[boards[:, points] != EMPTY] = 2.0
+        moves = points[np.argmin(keys, axis=1)]
+        boards[rows, moves] = to_play
+
+        rays = tables.capture_rays[moves]    # (games, 8, 3)
+        stones = boards[rows[:, None, None], rays]
+        captured = (stones[:, :, 0] == O) & (stones[:, :, 1] == O) & (stones[:, :, 2] == to_play)
+        capture_rows, capture_dirs = np.nonzero(captured)
+        boards[capture_rows, rays[capture_rows, capture_dirs, 0]] = EMPTY
+        boards[capture_rows, rays[capture_rows, capture_dirs, 1]] = EMPTY
+        num_captured = 2 * captured.sum(axis=1)
+        captures[:, to_play] += num_captured
+        num_empty += num_captured - 1
+
+        # length of the runs of to_play stones next to the move, on each side of each line
+        same = boards[rows[:, None, None, None], tables.five_rays[moves]] == to_play
+        runs = np.cumprod(same, axis=3).sum(axis=3)
+        won = (runs.sum(axis=2) >= 4).any(axis=1) | (captures[:, to_play] >= 10)
+        winners[ids[won]] = to_play
+        over = won | (num_empty == 0)
+        if over.any():
+            going = ~over
+            ids = ids[going]
+            boards = boards[going]
+            captures = captures[going]
+            num_empty = num_empty[going]
+    return winners
@@ -12,8 +12,8 @@ The board uses a 1-dimensional representation with padding
 """
 
 import numpy as np
-from typing import List, Tuple
-from random import shuffle
+from typing import Dict, List, Tuple
+import random
 
 from board_base import (
     board_array_size,
@@ -34,6 +34,174 @@ from board_base import (
 )
 
 
+class BoardGeometry(object):
+    """
+    Geometry of a board size that never changes during a game:
+    the empty board template, all rows, cols and diags
+    and neighbor and capture offsets.
+    One instance per size is shared by all boards of that size,
+    see get_geometry.
+    """
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        self.NS: int = size + 1
+        self.maxpoint: int = board_array_size(size)
+        self.empty_board: np.ndarray = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
+        for row in range(1, size + 1):
+            start: int = row * self.NS + 1
+            self.empty_board[start : start + size] = EMPTY
+        self.empty_board.flags.writeable = False
+        # all points on the board, and the position of each in that array
+        self.board_points: np.ndarray = where1d(self.empty_board == EMPTY).astype(GO_POINT)
+        self.board_points.flags.writeable = False
+        self.board_point_index: np.ndarray = np.full(self.maxpoint, -1, dtype=GO_POINT)
+        self.board_point_index[self.board_points] = np.arange(len(self.board_points))
+        self.board_point_index.flags.writeable = False
+        self.neighbor_offsets = (-1, 1, -self.NS, self.NS)
+        self.diag_neighbor_offsets = (-self.NS - 1, -self.NS + 1, self.NS - 1, self.NS + 1)
+        self.capture_offsets = (1, -1, self.NS, -self.NS, self.NS+1, -(self.NS+1), self.NS-1, -self.NS+1)
+        self.rows, self.cols, self.diags = self._calculate_rows_cols_diags()
+        self.lines = self.rows + self.cols + self.diags
+        self.neighbors, self.diag_neighbors, self.capture_rays, self.five_rays = self._calculate_point_tables()
+        # every window of 5 and 6 consecutive points on a line, one per matrix row
+        self.windows5: np.ndarray = self._line_windows(5)
+        self.windows6: np.ndarray = self._line_windows(6)
+
+    def _walk(self, start: int, step: int) -> Tuple[int, ...]:
+        line = []
+        pt = start
+        while self.empty_board[pt] == EMPTY:
+            line.append(pt)
+            pt += step
+        return tuple(line)
+
+    def _calculate_point_tables(self) -> Tuple[tuple, tuple, tuple, tuple]:
+        """
+        Tables indexed by point, empty for points off the board:
+        - the four neighbors and the four diagonal neighbors
+        - the capture rays, one (stone, stone, bracketing point) triple
+          for each of the eight directions that fits on the board
+        - the five rays, one (forward, backward) pair of point tuples for
+          each of the four lines through the point, up to four points long
+        """
+        def on_board(pt: int) -> bool:
+            return 0 <= pt < self.maxpoint and self.empty_board[pt] == EMPTY
+
+        def ray(pt: int, step: int, length: int) -> Tuple[int, ...]:
+            points = []
+            while len(points) < length and on_board(pt + step):
+                pt += step
+                points.append(pt)
+            return tuple(points)
+
+        neighbors = []
+        diag_neighbors = []
+        capture_rays = []
+        five_rays = []
+        for point in range(self.maxpoint):
+            if not on_board(point):
+                for table in (neighbors, diag_neighbors, capture_rays, five_rays):
+                    table.append(())
+                continue
+            neighbors.append(tuple(point + offset for offset in self.neighbor_offsets))
+            diag_neighbors.append(tuple(point + offset for offset in self.diag_neighbor_offsets))
+            rays = (ray(point, offset, 3) for offset in self.capture_offsets)
+            capture_rays.append(tuple(r for r in rays if len(r) == 3))
+            five_rays.append(tuple((ray(point, step, 4), ray(point, -step, 4))
+                                   for step in (1, self.NS, self.NS + 1, self.NS - 1)))
+        return tuple(neighbors), tuple(diag_neighbors), tuple(capture_rays), tuple(five_rays)
+
+    def _calculate_rows_cols_diags(self) -> Tuple[tuple, tuple, tuple]:
+        if self.size < 5:
+            return (), (), ()
+        # precalculate all rows, cols, and diags for 5-in-a-row detection
+        rows = []
+        cols = []
+        for i in range(1, self.size + 1):
+            rows.append(self._walk(i * self.NS + 1, 1))
+            cols.append(self._walk(self.NS + i, self.NS))
+        diags = []
+        # diag towards SE, starting from first row (1,1) moving right to (1,n)
+        # diag towards SE and NE, starting from (2,1) downwards to (n,1)
+        # diag towards NE, starting from (n,2) moving right to (n,n)
+        first_row = [self.NS + i for i in range(1, self.size + 1)]
+        first_col = [row * self.NS + 1 for row in range(2, self.size + 1)]
+        last_row = [self.size * self.NS + i for i in range(2, self.size + 1)]
+        for start in first_row:
+            diags.append(self._walk(start, self.NS + 1))
+        for start in first_col:
+            diags.append(self._walk(start, self.NS + 1))
+            diags.append(self._walk(start, -self.NS + 1))
+        for start in last_row:
+            diags.append(self._walk(start, -self.NS + 1))
+        diags = [d for d in diags if len(d) >= 5]
+        assert len(rows) == self.size
+        assert len(cols) == self.size
+        assert len(diags) == (2 * (self.size - 5) + 1) * 2
+        return tuple(rows), tuple(cols), tuple(diags)
+
+    def _line_windows(self, length: int) -> np.ndarray:
+        windows = []
+        for line in self.lines:
+            for i in range(len(line) - length + 1):
+                windows.append(line[i : i + length])
+        windows = np.array(windows, dtype=np.intp).reshape(-1, length)
+        windows.flags.writeable = False
+        return windows
+
+
+_geometries: Dict[int, BoardGeometry] = {}
+
+def get_geometry(size: int) -> BoardGeometry:
+    """
+    Return the BoardGeometry shared by all boards of the given size.
+    """
+    if size not in _geometries:
+        _geometries[size] = BoardGeometry(size)
+    return _geometries[size]
+
+
+"""
+Patterns of the rule-based policy, written for BLACK,
+each with the index of the move to play in the pattern.
+All windows of a board are matched at once: the colors of a window
+are encoded as a base-4 number, which indexes a table holding the
+move index of the matching pattern, or -1 if no pattern matches.
+"""
+FIVE_PATTERNS = [
+    ([EMPTY, BLACK, BLACK, BLACK, BLACK], 0),    # .XXXX
+    ([BLACK, EMPTY, BLACK, BLACK, BLACK], 1),    # X.XXX
+    ([BLACK, BLACK, EMPTY, BLACK, BLACK], 2),    # XX.XX
+    ([BLACK, BLACK, BLACK, EMPTY, BLACK], 3),    # XXX.X
+    ([BLACK, BLACK, BLACK, BLACK, EMPTY], 4)     # XXXX.
+]
+
+OPEN_FOUR_PATTERNS = [
+    ([EMPTY, EMPTY, BLACK, BLACK, BLACK, EMPTY], 1),    # ..XXX.
+    ([EMPTY, BLACK, EMPTY, BLACK, BLACK, EMPTY], 2),    # .X.XX.
+    ([EMPTY, BLACK, BLACK, EMPTY, BLACK, EMPTY], 3),    # .XX.X.
+    ([EMPTY, BLACK, BLACK, BLACK, EMPTY, EMPTY], 4)     # .XXX..
+]
+
+def base4_powers(length: int) -> np.ndarray:
+    return 4 ** np.arange(length - 1, -1, -1)
+
+def pattern_table(patterns: List[Tuple[List[GO_COLOR], int]], color: GO_COLOR) -> np.ndarray:
+    """
+    Lookup table from window code to move index, for the patterns played by color.
+    """
+    length = len(patterns[0][0])
+    table = np.full(4 ** length, -1, dtype=np.intp)
+    for pattern, move_index in patterns:
+        colors = [color if c == BLACK else c for c in pattern]
+        table[np.dot(colors, base4_powers(length))] = move_index
+    table.flags.writeable = False
+    return table
+
+FIVE_TABLES = {color: pattern_table(FIVE_PATTERNS, color) for color in (BLACK, WHITE)}
+OPEN_FOUR_TABLES = {color: pattern_table(OPEN_FOUR_PATTERNS, color) for color in (BLACK, WHITE)}
+
+
 """
 The GoBoard class implements a board and basic functions to play
 moves, check the end of the game, and count the acore at the end.
@@ -50,9 +218,6 @@ class GoBoard(object):
         """
         assert 2 <= size <= MAXSIZE
         self.reset(size)
-        self.calculate_rows_cols_diags()
-        self.black_captures = 0
-        self.white_captures = 0
 
     def add_two_captures(self, color: GO_COLOR) -> None:
         if color == BLACK:
@@ -65,66 +230,6 @@ class GoBoard(object):
             return self.black_captures
         elif color == WHITE:
             return self.white_captures
-    
-    def calculate_rows_cols_diags(self) -> None:
-        if self.size < 5:
-            return
-        # precalculate all rows, cols, and diags for 5-in-a-row detection
-        self.rows = []
-        self.cols = []
-        for i in range(1, self.size + 1):
-            current_row = []
-            start = self.row_start(i)
-            for pt in range(start, start + self.size):
-                current_row.append(pt)
-            self.rows.append(current_row)
-            
-            start = self.row_start(1) + i - 1
-            current_col = []
-            for pt in range(start, self.row_start(self.size) + i, self.NS):
-                current_col.append(pt)
-            self.cols.append(current_col)
-        
-        self.diags = []
-        # diag towards SE, starting from first row (1,1) moving right to (1,n)
-        start = self.row_start(1)
-        for i in range(start, start + self.size):
-            diag_SE = []
-            pt = i
-            while self.get_color(pt) == EMPTY:
-                diag_SE.append(pt)
-                pt += self.NS + 1
-            if len(diag_SE) >= 5:
-                self.diags.append(diag_SE)
-        # diag towards SE and NE, starting from (2,1) downwards to (n,1)
-        for i in range(start + self.NS, self.row_start(self.size) + 1, self.NS):
-            diag_SE = []
-            diag_NE = []
-            pt = i
-            while self.get_color(pt) == EMPTY:
-                diag_SE.append(pt)
-                pt += self.NS + 1
-            pt = i
-            while self.get_color(pt) == EMPTY:
-                diag_NE.append(pt)
-                pt += -1 * self.NS + 1
-            if len(diag_SE) >= 5:
-                self.diags.append(diag_SE)
-            if len(diag_NE) >= 5:
-                self.diags.append(diag_NE)
-        # diag towards NE, starting from (n,2) moving right to (n,n)
-        start = self.row_start(self.size) + 1
-        for i in range(start, start + self.size):
-            diag_NE = []
-            pt = i
-            while self.get_color(pt) == EMPTY:
-                diag_NE.append(pt)
-                pt += -1 * self.NS + 1
-            if len(diag_NE) >=5:
-                self.diags.append(diag_NE)
-        assert len(self.rows) == self.size
-        assert len(self.cols) == self.size
-        assert len(self.diags) == (2 * (self.size - 5) + 1) * 2
 
     def reset(self, size: int) -> None:
         """
@@ -137,23 +242,28 @@ class GoBoard(object):
         self.last_move: GO_POINT = NO_POINT
         self.last2_move: GO_POINT = NO_POINT
         self.current_player: GO_COLOR = BLACK
-        self.maxpoint: int = board_array_size(size)
-        self.board: np.ndarray[GO_POINT] = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
-        self._initialize_empty_points(self.board)
-        self.calculate_rows_cols_diags()
+        self.geometry: BoardGeometry = get_geometry(size)
+        self.maxpoint: int = self.geometry.maxpoint
+        self.board: np.ndarray[GO_POINT] = self.geometry.empty_board.copy()
+        # set of empty points: dense array of the points, and each point's index in it
+        self.empty_points: np.ndarray[GO_POINT] = self.geometry.board_points.copy()
+        self.empty_index: np.ndarray[GO_POINT] = self.geometry.board_point_index.copy()
+        self.num_empty: int = len(self.empty_points)
+        self.rows = self.geometry.rows
+        self.cols = self.geometry.cols
+        self.diags = self.geometry.diags
         self.black_captures = 0
         self.white_captures = 0
 
     def copy(self) -> 'GoBoard':
-        b = GoBoard(self.size)
-        assert b.NS == self.NS
-        assert b.WE == self.WE
-        b.ko_recapture = self.ko_recapture
-        b.last_move = self.last_move
-        b.last2_move = self.last2_move
-        b.current_player = self.current_player
-        assert b.maxpoint == self.maxpoint
-        b.board = np.copy(self.board)
+        """
+        Copies the mutable state, the geometry is shared with the copy.
+        """
+        b = GoBoard.__new__(GoBoard)
+        b.__dict__.update(self.__dict__)
+        b.board = self.board.copy()
+        b.empty_points = self.empty_points.copy()
+        b.empty_index = self.empty_index.copy()
         return b
 
     def get_color(self, point: GO_POINT) -> GO_COLOR:
@@ -204,7 +314,32 @@ class GoBoard(object):
         Return:
             The empty points on the board
         """
-        return where1d(self.board == EMPTY)
+        return np.sort(self.empty_points[:self.num_empty])
+
+    def num_empty_points(self) -> int:
+        return self.num_empty
+
+    def random_empty_point(self) -> GO_POINT:
+        """
+        Return an empty point chosen uniformly at random.
+        """
+        return self.empty_points[random.randrange(self.num_empty)]
+
+    def _remove_empty_point(self, point: GO_POINT) -> None:
+        """
+        Remove point from the empty point set by moving the last
+        empty point into its slot.
+        """
+        i = self.empty_index[point]
+        self.num_empty -= 1
+        last = self.empty_points[self.num_empty]
+        self.empty_points[i] = last
+        self.empty_index[last] = i
+
+    def _add_empty_point(self, point: GO_POINT) -> None:
+        self.empty_points[self.num_empty] = point
+        self.empty_index[point] = self.num_empty
+        self.num_empty += 1
 
     def row_start(self, row: int) -> int:
         assert row >= 1
@@ -314,15 +449,18 @@ class GoBoard(object):
         if self.board[point] != EMPTY:
             return False
         self.board[point] = color
+        self._remove_empty_point(point)
         self.current_player = opponent(color)
         self.last2_move = self.last_move
         self.last_move = point
         O = opponent(color)
-        offsets = [1, -1, self.NS, -self.NS, self.NS+1, -(self.NS+1), self.NS-1, -self.NS+1]
-        for offset in offsets:
-            if self.board[point+offset] == O and self.board[point+(offset*2)] == O and self.board[point+(offset*3)] == color:
-                self.board[point+offset] = EMPTY
-                self.board[point+(offset*2)] = EMPTY
+        board = self.board
+        for p1, p2, end in self.geometry.capture_rays[point]:
+            if board[p1] == O and board[p2] == O and board[end] == color:
+                board[p1] = EMPTY
+                board[p2] = EMPTY
+                self._add_empty_point(p1)
+                self._add_empty_point(p2)
                 if color == BLACK:
                     self.black_captures += 2
                 else:
@@ -337,16 +475,13 @@ class GoBoard(object):
                 nbc.append(nb)
         return nbc
 
-    def _neighbors(self, point: GO_POINT) -> List:
-        """ List of all four neighbors of the point """
-        return [point - 1, point + 1, point - self.NS, point + self.NS]
+    def _neighbors(self, point: GO_POINT) -> Tuple:
+        """ All four neighbors of the point """
+        return self.geometry.neighbors[point]
 
-    def _diag_neighbors(self, point: GO_POINT) -> List:
-        """ List of all four diagonal neighbors of point """
-        return [point - self.NS - 1,
-                point - self.NS + 1,
-                point + self.NS - 1,
-                point + self.NS + 1]
+    def _diag_neighbors(self, point: GO_POINT) -> Tuple:
+        """ All four diagonal neighbors of point """
+        return self.geometry.diag_neighbors[point]
 
     def last_board_moves(self) -> List:
         """
@@ -365,18 +500,10 @@ class GoBoard(object):
         Returns BLACK or WHITE if any five in a row is detected for the color
         EMPTY otherwise.
         """
-        for r in self.rows:
-            result = self.has_five_in_list(r)
-            if result != EMPTY:
-                return result
-        for c in self.cols:
-            result = self.has_five_in_list(c)
-            if result != EMPTY:
-                return result
-        for d in self.diags:
-            result = self.has_five_in_list(d)
-            if result != EMPTY:
-                return result
+        stones = self.board[self.geometry.windows5]
+        for color in (BLACK, WHITE):
+            if (stones == color).all(axis=1).any():
+                return color
         return EMPTY
 
     def has_five_in_list(self, list) -> GO_COLOR:
@@ -409,7 +536,7 @@ class GoBoard(object):
             return False
 
     def endOfGame(self) -> bool:
-        return self.get_empty_points().size == 0\
+        return self.num_empty_points() == 0\
             or self.detect_five_in_a_row() != EMPTY\
             or self.black_captures >= 10\
             or self.white_captures >= 10\
@@ -419,10 +546,8 @@ class GoBoard(object):
         to_play = color
         if not self.endOfGame():
             while not self.endOfGame():
-                all_moves = list(self.get_empty_points())
-                shuffle(all_moves)
                 to_play = opponent(to_play)
-                self.play_move(all_moves[0], to_play)
+                self.play_move(self.random_empty_point(), to_play)
 
         return self.winner(color)
 
@@ -447,19 +572,19 @@ class GoBoard(object):
     def getBoardsize(self):
         return self.size
     
-    def swapPlayerPattern(self, patterns):
-        for p in patterns:
-            for pt in range(len(p)):
-                if p[pt] == BLACK:
-                    p[pt] = WHITE
-
-    def getPattern(self, line, start, length):
-        pattern = []
-        if len(line) - start < length:
-            return pattern
-        for i in range(length):
-            pattern.append(self.get_color(line[i + start]))
-        return pattern
+    def matchPatterns(self, windows: np.ndarray, table: np.ndarray) -> List[int]:
+        """
+        Match all windows against a pattern table in one pass.
+        Returns the move of each matching window, in window order,
+        without duplicates.
+        """
+        if len(windows) == 0:
+            return []
+        codes = self.board[windows] @ base4_powers(windows.shape[1])
+        move_index = table[codes]
+        matches = np.nonzero(move_index >= 0)[0]
+        moves = windows[matches, move_index[matches]]
+        return list(dict.fromkeys(moves.tolist()))
     
     ### RULE FUNCTIONS ###
     
@@ -467,36 +592,18 @@ class GoBoard(object):
         """
         Check if the current player can win directly, return all winning moves if exist, [] otherwise.
         """
-        
         # Check for 5 in a row
-        opp = opponent(player)
-        winning_moves = []
-        for line in self.getLinePositions():
-            for i in range(len(line) - 4):
-                emptyPos = -1
-                for pos in line[i: i + 5]:  # get five consecutive positions in a line
-                    # Check for capture win
-                    if player == BLACK:
-                        if self.capturePiecesCount(pos, player) + self.black_captures >= 10:
-                            if pos not in winning_moves:
-                                winning_moves.append(pos)
-                    elif player == WHITE:
-                        if self.capturePiecesCount(pos, player) + self.white_captures >= 10:
-                            if pos not in winning_moves:
-                                winning_moves.append(pos)
-                    color = self.get_color(pos)
-                    if color == EMPTY:
-                        if emptyPos == -1:
-                            emptyPos = pos
-                        else:   # more than 1 empty pos in this line
-                            emptyPos = -1
-                            break
-                    elif color == opp:
-                        emptyPos = -1
-                        break
-                if emptyPos != -1 and emptyPos not in winning_moves:
-                    winning_moves.append(emptyPos)
+        winning_moves = self.matchPatterns(self.geometry.windows5, FIVE_TABLES[player])
 
+        # Check for capture win
+        if player == BLACK:
+            captures = self.black_captures
+        else:
+            captures = self.white_captures
+        moves = self.get_empty_points()
+        for move in moves[self.capture_counts(player) + captures >= 10].tolist():
+            if move not in winning_moves:
+                winning_moves.append(move)
         return winning_moves
     
     def checkBlockWin(self, player) -> List[int]:
@@ -514,13 +621,12 @@ class GoBoard(object):
 
         stallList = []
         moves = self.get_empty_points()
-        for move in moves:
+        for move in moves[self.capture_counts(player) >= 2]:
             cBoard = self.copy()
-            if cBoard.capturePiecesCount(move, player) >= 2:
-                cBoard.play_move(move, player)
-                reducedCheckList = cBoard.checkWin(opponent(player))
-                if len(reducedCheckList) < len(blocking_moves):
-                    stallList.append(move)
+            cBoard.play_move(move, player)
+            reducedCheckList = cBoard.checkWin(opponent(player))
+            if len(reducedCheckList) < len(blocking_moves):
+                stallList.append(move)
 
         for move in stallList:
             if move not in blocking_moves:
@@ -531,130 +637,42 @@ class GoBoard(object):
         """
         if the color to play has a move that creates an open four position of type .XXXX., then play it.
         """
-        patterns = [
-            [EMPTY, EMPTY, BLACK, BLACK, BLACK, EMPTY],    # ..XXX. mv = 1
-            [EMPTY, BLACK, EMPTY, BLACK, BLACK, EMPTY],    # .X.XX. mv = 2
-            [EMPTY, BLACK, BLACK, EMPTY, BLACK, EMPTY],    # .XX.X. mv = 3
-            [EMPTY, BLACK, BLACK, BLACK, EMPTY, EMPTY]     # .XXX.. mv = 4
-        ]
-
-        if player == WHITE:
-            self.swapPlayerPattern(patterns)
-
-        line_size = self.getBoardsize()
-        pattern_length = 6
-        comparisons = line_size - pattern_length + 1
-
-        lines = self.getLinePositions()
-        openfour_moves = []
-        
-        if comparisons > 0:
-            for line in lines:
-                for offset in range(comparisons):
-                    pattern = self.getPattern(line, offset, pattern_length)
-                    if pattern in patterns:
-                        i = patterns.index(pattern)
-                        move = line[(i + 1) + offset]
-                        if move not in openfour_moves:
-                            assert self.get_color(move) == EMPTY
-                            openfour_moves.append(move)
-
-        return openfour_moves
+        return self.matchPatterns(self.geometry.windows6, OPEN_FOUR_TABLES[player])
     
     def checkCapture(self, player) -> List[int]:
-        moveList = []
         moves = self.get_empty_points()
-        for move in moves:
-            if self.capturePiecesCount(move, player) >= 2:
-                moveList.append(move)
-        return moveList
+        return list(moves[self.capture_counts(player) >= 2])
+
+    def capture_counts(self, color) -> np.ndarray:
+        """
+        Number of stones color captures by playing on each empty point,
+        aligned with get_empty_points().
+        Computed for all points at once: for each of the four line
+        directions, shifted views of the board test the pattern
+        opp opp own on both sides of every point.
+        """
+        n = self.maxpoint
+        own = self.board == color
+        opp = self.board == opponent(color)
+        captures = np.zeros(n, dtype=np.int32)
+        for d in (1, self.NS, self.NS + 1, self.NS - 1):
+            # point+d, point+2d opponent stones bracketed by own stone on point+3d
+            captures[: n - 3*d] += opp[d : n - 2*d] & opp[2*d : n - d] & own[3*d :]
+            # same towards lower points
+            captures[3*d :] += opp[2*d : n - d] & opp[d : n - 2*d] & own[: n - 3*d]
+        return 2 * captures[self.get_empty_points()]
     
     def capturePiecesCount(self, point, color):
-            capturesThisTurn = 0
-            
-            #Horizontal capture
-            leftIndex = point - 1
-            rightIndex = point + 1
-            countLeft = 0
-            countRight = 0
-            captureList = []
-            opp_color = opponent(color) 
-            while (self.board[leftIndex] == opp_color):
-                    captureList.append(leftIndex)
-                    countLeft += 1
-                    leftIndex -= 1
-            if (self.board[leftIndex] == color and countLeft == 2):
-                capturesThisTurn += countLeft
-
-            captureList.clear()
-            while (self.board[rightIndex] == opp_color):
-                    captureList.append(rightIndex)
-                    rightIndex += 1
-                    countRight += 1   
-            if (self.board[rightIndex] == color and countRight == 2):
-                capturesThisTurn += countRight  
-                    
-
-            #Vertical capture
-            downIndex = point - self.NS
-            upIndex = point + self.NS
-            countUp = 0
-            countDown = 0
-            captureList = []
-            opp_color = opponent(color) 
-            while (self.board[downIndex] == opp_color):
-                    captureList.append(downIndex)
-                    countDown += 1
-                    downIndex -= self.NS
-            if (self.board[downIndex] == color and countDown == 2):
-                capturesThisTurn += countDown
-            captureList.clear()
-            while (self.board[upIndex] == opp_color):
-                    captureList.append(upIndex)
-                    upIndex += self.NS
-                    countUp += 1   
-            if (self.board[upIndex] == color and countUp == 2):
-                capturesThisTurn += countUp
-              
-            #Diagonal Captures
-            captureList = []
-            upLeftIndex = point + self.NS - 1
-            countUpLeft = 0
-            downRightIndex = point - (self.NS - 1)
-            countDownRight = 0
-            while (self.board[upLeftIndex] == opp_color):
-                    captureList.append(upLeftIndex)
-                    countUpLeft += 1
-                    upLeftIndex += self.NS - 1
-            if (self.board[upLeftIndex] == color and countUpLeft == 2):
-                capturesThisTurn += countUpLeft
-                
-            while (self.board[downRightIndex] == opp_color):
-                    captureList.append(downRightIndex)
-                    countDownRight += 1
-                    downRightIndex -= (self.NS - 1)
-            if (self.board[downRightIndex] == color and countDownRight == 2):
-                capturesThisTurn += countDownRight
-
-            captureList = []
-            downLeftIndex = point - (self.NS + 1)
-            countDownLeft = 0
-            upRightIndex = point + self.NS + 1
-            countUpRight = 0
-            while (self.board[downLeftIndex] == opp_color):
-                    captureList.append(downLeftIndex)
-                    countDownLeft += 1
-                    downLeftIndex -= (self.NS + 1)
-            if (self.board[downLeftIndex] == color and countDownLeft == 2):
-                capturesThisTurn += countDownLeft
-                    
-            while (self.board[upRightIndex] == opp_color):
-                    captureList.append(upRightIndex)
-                    countUpRight += 1
-                    upRightIndex += self.NS + 1
-            if (self.board[upRightIndex] == color and countUpRight == 2):
-                capturesThisTurn += countUpRight
-            return capturesThisTurn
+        """
+        Number of opponent stones that color would capture by playing on point.
+        """
+        board = self.board
+        opp_color = opponent(color)
+        capturesThisTurn = 0
+        for p1, p2, end in self.geometry.capture_rays[point]:
+            if board[p1] == opp_color and board[p2] == opp_color and board[end] == color:
+                capturesThisTurn += 2
+        return capturesThisTurn
     
     def simulateRules(self, color):
         """
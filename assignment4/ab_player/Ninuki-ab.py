@@ -11,8 +11,10 @@ from board_base import DEFAULT_SIZE, GO_POINT, GO_COLOR
 from board import GoBoard
 from board_util import GoBoardUtil
 from engine import GoEngine
-import time
 import random
+from transposition_table import TranspositionTable, EXACT, LOWER, UPPER
+from move_ordering import MoveOrdering
+from search_control import SearchControl
 from board_base import (
     BLACK,
     WHITE,
@@ -25,6 +27,12 @@ from board_base import (
     opponent
 )
 
+"""
+Depth stored in the table for results that are proven, not just
+searched to a depth: they hold at any depth.
+"""
+SOLVED_DEPTH = 10000
+
 
 class ABPlayer(GoEngine):
     def __init__(self) -> None:
@@ -34,6 +42,17 @@ class ABPlayer(GoEngine):
         """
         GoEngine.__init__(self, "Go0", 1.0)
         self.time_limit = 1
+        self.control = SearchControl()
+        self.tt = TranspositionTable()    # kept from move to move within a game
+
+    def new_game(self) -> None:
+        self.tt.clear()
+
+    def stop(self) -> None:
+        self.control.stop()
+
+    def clear_stop(self) -> None:
+        self.control.clearStop()
 
     def get_move(self, board: GoBoard, color: GO_COLOR) -> GO_POINT:
         if board.get_empty_points().size == 0:
@@ -46,7 +65,10 @@ class ABPlayer(GoEngine):
         return format_point(point_to_coord(self.best_move, self.board.size)).lower()
 
     def alpha_beta(self, alpha, beta, depth):
-        if time.time() - self.solve_start_time > (self.time_limit - 0.01):
+        """
+        Returns (value, solved, timeout) for the player to move, value in -1, 0, 1.
+        """
+        if self.control.tick():
             return 0, False, True
 
         is_terminal, winner = self.board.is_terminal()
@@ -61,13 +83,35 @@ class ABPlayer(GoEngine):
         if depth >= self.max_depth:
             return 0, False, False
 
+        # a table entry decides this node if it is proven or searched at least as deep,
+        # and its bound decides the window; otherwise its move is tried first
+        remaining = self.max_depth - depth
+        code = self.board.get_hash_code()
+        hash_move = None
+        slot = self.tt.probe(code)
+        if slot >= 0:
+            value = int(self.tt.values[slot])
+            bound = self.tt.bounds[slot]
+            entry_depth = self.tt.depths[slot]
+            if depth > 0 and entry_depth >= remaining:
+                if bound == EXACT \
+                        or (bound == LOWER and value >= beta) \
+                        or (bound == UPPER and value <= alpha):
+                    return value, entry_depth == SOLVED_DEPTH, False
+            if self.tt.moves[slot] >= 0:
+                hash_move = self.tt.moves[slot]
+
         any_unsolved = False
-        moves = GoBoardUtil.generate_legal_moves(self.board, self.board.current_player)
+        alpha_orig = alpha
+        best_move = None
+        color = self.board.current_player
+        moves = GoBoardUtil.generate_legal_moves(self.board, color)
         if depth == 0:
             random.shuffle(moves)
+        moves = self.ordering.order(moves, color, depth, hash_move)
 
         for move in moves:
-            self.board.play_move(move, self.board.current_player)
+            self.board.play_move(move, color)
             
             value, solved, timeout = self.alpha_beta(-beta, -alpha, depth+1)
             self.board.undo()
@@ -81,21 +125,28 @@ class ABPlayer(GoEngine):
 
             if value > alpha:
                 alpha = value
+                best_move = move
                 if depth == 0:
                     self.best_move = move
 
             if solved and value == 1:
+                self.tt.store(code, 1, move, SOLVED_DEPTH, EXACT)
                 return 1, True, False
 
             if value >= beta:
-                return beta, True, False
+                self.ordering.cutoff(move, color, depth, remaining)
+                self.tt.store(code, beta, move, SOLVED_DEPTH if solved else remaining, LOWER)
+                return beta, solved, False
         
+        self.tt.store(code, alpha, best_move, remaining if any_unsolved else SOLVED_DEPTH,
+                      EXACT if alpha > alpha_orig else UPPER)
         return alpha, not any_unsolved, False
 
     def solve_board(self, board):
-        self.solve_start_time = time.time()
+        self.control.start(self.time_limit - 0.01)
         self.board = board.copy()
-        self.tt = {}
+        self.tt.newSearch()
+        self.ordering = MoveOrdering(self.board.maxpoint, self.board.get_empty_points().size)
         if self.board.get_empty_points().size == 0:
             self.best_move = PASS
         else:
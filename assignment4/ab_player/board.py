@@ -12,7 +12,7 @@ The board uses a 1-dimensional representation with padding
 """
 
 import numpy as np
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from board_base import (
     board_array_size,
@@ -31,6 +31,131 @@ from board_base import (
     GO_COLOR,
     GO_POINT,
 )
+from zobrist_hash import get_hasher
+
+
+class BoardGeometry(object):
+    """
+    Lookup tables of a board size that never change during a game:
+    neighbors, capture rays and five rays of every point.
+    One instance per size is shared by all boards of that size,
+    see get_geometry.
+    """
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        self.NS: int = size + 1
+        self.maxpoint: int = board_array_size(size)
+        self.empty_board: np.ndarray = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
+        for row in range(1, size + 1):
+            start: int = row * self.NS + 1
+            self.empty_board[start : start + size] = EMPTY
+        self.empty_board.flags.writeable = False
+        self.neighbor_offsets = (-1, 1, -self.NS, self.NS)
+        self.diag_neighbor_offsets = (-self.NS - 1, -self.NS + 1, self.NS - 1, self.NS + 1)
+        self.capture_offsets = (1, -1, self.NS, -self.NS, self.NS+1, -(self.NS+1), self.NS-1, -self.NS+1)
+        self.neighbors, self.diag_neighbors, self.capture_rays, self.five_rays = self._calculate_point_tables()
+
+    def _calculate_point_tables(self) -> Tuple[tuple, tuple, tuple, tuple]:
+        """
+        Tables indexed by point, empty for points off the board:
+        - the four neighbors and the four diagonal neighbors
+        - the capture rays, one (stone, stone, bracketing point) triple
+          for each of the eight directions that fits on the board
+        - the five rays, one (forward, backward) pair of point tuples for
+          each of the four lines through the point, up to four points long
+        """
+        def on_board(pt: int) -> bool:
+            return 0 <= pt < self.maxpoint and self.empty_board[pt] == EMPTY
+
+        def ray(pt: int, step: int, length: int) -> Tuple[int, ...]:
+            points = []
+            while len(points) < length and on_board(pt + step):
+                pt += step
+                points.append(pt)
+            return tuple(points)
+
+        neighbors = []
+        diag_neighbors = []
+        capture_rays = []
+        five_rays = []
+        for point in range(self.maxpoint):
+            if not on_board(point):
+                for table in (neighbors, diag_neighbors, capture_rays, five_rays):
+                    table.append(())
+                continue
+            neighbors.append(tuple(point + offset for offset in self.neighbor_offsets))
+            diag_neighbors.append(tuple(point + offset for offset in self.diag_neighbor_offsets))
+            rays = (ray(point, offset, 3) for offset in self.capture_offsets)
+            capture_rays.append(tuple(r for r in rays if len(r) == 3))
+            five_rays.append(tuple((ray(point, step, 4), ray(point, -step, 4))
+                                   for step in (1, self.NS, self.NS + 1, self.NS - 1)))
+        return tuple(neighbors), tuple(diag_neighbors), tuple(capture_rays), tuple(five_rays)
+
+
+_geometries: Dict[int, BoardGeometry] = {}
+
+def get_geometry(size: int) -> BoardGeometry:
+    """
+    Return the BoardGeometry shared by all boards of the given size.
+    """
+    if size not in _geometries:
+        _geometries[size] = BoardGeometry(size)
+    return _geometries[size]
+
+
+class MoveJournal(object):
+    """
+    Undo journal for make/unmake, stored in one preallocated integer array.
+    Each entry holds the point and color of a move, the capture counts
+    and last moves from before the move, and the stones it captured.
+    The array is allocated once for the longest possible game, so playing
+    and undoing moves does not allocate.
+    """
+    POINT, COLOR, BLACK_CAPTURES, WHITE_CAPTURES, LAST_MOVE, LAST2_MOVE, NUM_CAPTURED = range(7)
+    CAPTURED = 7
+    MAX_CAPTURED = 16    # two stones in each of the eight directions
+
+    def __init__(self, board_size: int) -> None:
+        self.entries: np.ndarray = np.empty((self.max_moves(board_size), self.CAPTURED + self.MAX_CAPTURED),
+                                            dtype=np.int32)
+        self.size: int = 0
+
+    @staticmethod
+    def max_moves(board_size: int) -> int:
+        """
+        Most moves a game can last: one per point, plus one per stone
+        captured before the last move. Both players have captured fewer
+        than 10 stones until then, so that is at most 8 stones each.
+        """
+        return board_size * board_size + 2 * 8
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, point: GO_POINT, color: GO_COLOR, black_captures: int, white_captures: int,
+             last_move: GO_POINT, last2_move: GO_POINT) -> None:
+        if self.size == len(self.entries):
+            # only when moves go on being played after the end of the game
+            self.entries = np.concatenate((self.entries, np.empty_like(self.entries)))
+        self.entries[self.size, : self.CAPTURED] = (point, color, black_captures, white_captures,
+                                                   last_move, last2_move, 0)
+        self.size += 1
+
+    def add_captured(self, point: GO_POINT) -> None:
+        """
+        Record a stone captured by the last pushed move
+        """
+        entry = self.entries[self.size - 1]
+        entry[self.CAPTURED + entry[self.NUM_CAPTURED]] = point
+        entry[self.NUM_CAPTURED] += 1
+
+    def pop(self) -> int:
+        """
+        Remove the last entry and return its row in self.entries, which
+        holds it until the next push. Read its fields with entries.item(row, field).
+        """
+        self.size -= 1
+        return self.size
 
 
 """
@@ -51,10 +176,6 @@ class GoBoard(object):
         self.reset(size)
         self.black_captures = 0
         self.white_captures = 0
-        self.depth = 0
-        self.black_capture_history = []
-        self.white_capture_history = []
-        self.move_history = []
 
     def add_two_captures(self, color: GO_COLOR) -> None:
         if color == BLACK:
@@ -78,15 +199,14 @@ class GoBoard(object):
         self.last_move: GO_POINT = NO_POINT
         self.last2_move: GO_POINT = NO_POINT
         self.current_player: GO_COLOR = BLACK
-        self.maxpoint: int = board_array_size(size)
-        self.board: np.ndarray[GO_POINT] = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
-        self._initialize_empty_points(self.board)
+        self.geometry: BoardGeometry = get_geometry(size)
+        self.maxpoint: int = self.geometry.maxpoint
+        self.board: np.ndarray[GO_POINT] = self.geometry.empty_board.copy()
         self.black_captures = 0
         self.white_captures = 0
-        self.depth = 0
-        self.black_capture_history = []
-        self.white_capture_history = []
-        self.move_history = []
+        self.journal = MoveJournal(size)
+        self.hasher = get_hasher(size)
+        self.code = 0    # running Zobrist code of the stones on the board
 
     def copy(self) -> 'GoBoard':
         b = GoBoard(self.size)
@@ -99,15 +219,20 @@ class GoBoard(object):
         b.board = np.copy(self.board)
         b.black_captures = self.black_captures
         b.white_captures = self.white_captures
-        b.depth = self.depth
-        b.black_capture_history = self.black_capture_history.copy()
-        b.white_capture_history = self.white_capture_history.copy()
-        b.move_history = self.move_history.copy()
+        b.code = self.code
         return b
 
     def get_color(self, point: GO_POINT) -> GO_COLOR:
         return self.board[point]
 
+    def get_hash_code(self) -> int:
+        """
+        Zobrist key of the position, covering the stones,
+        the side to move and both capture counters.
+        """
+        return self.hasher.positionCode(self.code, self.current_player,
+                                        self.black_captures, self.white_captures)
+
     def pt(self, row: int, col: int) -> GO_POINT:
         return coord_to_point(row, col, self.size)
 
@@ -157,48 +282,51 @@ class GoBoard(object):
         """
         if self.board[point] != EMPTY:
             return False
+        self.journal.push(point, color, self.black_captures, self.white_captures,
+                          self.last_move, self.last2_move)
         self.board[point] = color
+        zArray = self.hasher.zArray
+        self.code ^= zArray[point][color]
         self.current_player = opponent(color)
         self.last2_move = self.last_move
         self.last_move = point
         O = opponent(color)
-        offsets = [1, -1, self.NS, -self.NS, self.NS+1, -(self.NS+1), self.NS-1, -self.NS+1]
-        bcs = []
-        wcs = []
-        for offset in offsets:
-            if self.board[point+offset] == O and self.board[point+(offset*2)] == O and self.board[point+(offset*3)] == color:
-                self.board[point+offset] = EMPTY
-                self.board[point+(offset*2)] = EMPTY
+        board = self.board
+        for p1, p2, end in self.geometry.capture_rays[point]:
+            if board[p1] == O and board[p2] == O and board[end] == color:
+                board[p1] = EMPTY
+                board[p2] = EMPTY
+                self.code ^= zArray[p1][O] ^ zArray[p2][O]
+                self.journal.add_captured(p1)
+                self.journal.add_captured(p2)
                 if color == BLACK:
                     self.black_captures += 2
-                    bcs.append(point+offset)
-                    bcs.append(point+(offset*2))
                 else:
                     self.white_captures += 2
-                    wcs.append(point+offset)
-                    wcs.append(point+(offset*2))
-        self.depth += 1
-        self.black_capture_history.append(bcs)
-        self.white_capture_history.append(wcs)
-        self.move_history.append(point)
         return True
     
-    def undo(self):
-        self.board[self.move_history.pop()] = EMPTY
-        self.current_player = opponent(self.current_player)
-        self.depth -= 1
-        bcs = self.black_capture_history.pop()
-        for point in bcs:
-            self.board[point] = WHITE
-            self.black_captures -= 1
-        wcs = self.white_capture_history.pop()
-        for point in wcs:
-            self.board[point] = BLACK
-            self.white_captures -= 1
-        if len(self.move_history) > 0:
-            self.last_move = self.move_history[-1]
-        if len(self.move_history) > 1:
-            self.last2_move = self.move_history[-2]
+    def undo(self) -> None:
+        """
+        Takes back the last move played, with the stones it captured.
+        """
+        row = self.journal.pop()
+        item = self.journal.entries.item
+        point = item(row, MoveJournal.POINT)
+        color = item(row, MoveJournal.COLOR)
+        self.black_captures = item(row, MoveJournal.BLACK_CAPTURES)
+        self.white_captures = item(row, MoveJournal.WHITE_CAPTURES)
+        self.last_move = item(row, MoveJournal.LAST_MOVE)
+        self.last2_move = item(row, MoveJournal.LAST2_MOVE)
+        num_captured = item(row, MoveJournal.NUM_CAPTURED)
+        self.board[point] = EMPTY
+        zArray = self.hasher.zArray
+        self.code ^= zArray[point][color]
+        O = opponent(color)
+        for i in range(MoveJournal.CAPTURED, MoveJournal.CAPTURED + num_captured):
+            p = item(row, i)
+            self.board[p] = O
+            self.code ^= zArray[p][O]
+        self.current_player = color
 
     def neighbors_of_color(self, point: GO_POINT, color: GO_COLOR) -> List:
         """ List of neighbors of point of given color """
@@ -208,16 +336,36 @@ class GoBoard(object):
                 nbc.append(nb)
         return nbc
 
-    def _neighbors(self, point: GO_POINT) -> List:
-        """ List of all four neighbors of the point """
-        return [point - 1, point + 1, point - self.NS, point + self.NS]
+    def _neighbors(self, point: GO_POINT) -> Tuple:
+        """ All four neighbors of the point """
+        return self.geometry.neighbors[point]
+
+    def _diag_neighbors(self, point: GO_POINT) -> Tuple:
+        """ All four diagonal neighbors of point """
+        return self.geometry.diag_neighbors[point]
 
-    def _diag_neighbors(self, point: GO_POINT) -> List:
-        """ List of all four diagonal neighbors of point """
-        return [point - self.NS - 1,
-                point - self.NS + 1,
-                point + self.NS - 1,
-                point + self.NS + 1]
+    def five_in_a_row_at(self, point: GO_POINT) -> GO_COLOR:
+        """
+        Returns the color of a five in a row through the stone on point,
+        EMPTY if there is none.
+        """
+        board = self.board
+        color = board[point]
+        if color != BLACK and color != WHITE:
+            return EMPTY
+        for forward, backward in self.geometry.five_rays[point]:
+            count = 1
+            for p in forward:
+                if board[p] != color:
+                    break
+                count += 1
+            for p in backward:
+                if board[p] != color:
+                    break
+                count += 1
+            if count >= 5:
+                return color
+        return EMPTY
 
     def last_board_moves(self) -> List:
         """
@@ -239,21 +387,7 @@ class GoBoard(object):
         """
         if self.last_move == NO_POINT or self.last_move == PASS:
             return EMPTY
-        c = self.board[self.last_move]
-        for offset in [(1, 0), (0, 1), (1, 1), (1, -1)]:
-            i = 1
-            num_found = 1
-            while self.board[self.last_move + i * offset[0] * self.NS + i * offset[1]] == c:
-                i += 1
-                num_found += 1
-            i = -1
-            while self.board[self.last_move + i * offset[0] * self.NS + i * offset[1]] == c:
-                i -= 1
-                num_found += 1
-            if num_found >= 5:
-                return c
-        
-        return EMPTY
+        return self.five_in_a_row_at(self.last_move)
 
     def is_terminal(self):
         """
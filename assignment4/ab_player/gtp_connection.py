@@ -10,7 +10,9 @@ at the University of Edinburgh.
 """
 import traceback
 import numpy as np
+import queue
 import re
+import threading
 import time
 from sys import stdin, stdout, stderr
 from typing import Any, Callable, Dict, List, Tuple
@@ -73,7 +75,8 @@ class GtpConnection:
             "gogui-rules_board": self.gogui_rules_board_cmd,
             "gogui-analyze_commands": self.gogui_analyze_cmd,
             "timelimit": self.timelimit_cmd,
-            "solve": self.solve_cmd
+            "solve": self.solve_cmd,
+            "stop": self.stop_cmd
         }
 
         # argmap is used for argument checking
@@ -98,11 +101,32 @@ class GtpConnection:
         """
         Start a GTP connection. 
         This function continuously monitors standard input for commands.
+        A separate thread reads the input, so that a stop command ends a
+        running search at once; commands are still executed in order.
+        The reader thread only waits on standard input and queues lines,
+        all search runs on this thread, so the program still uses a single
+        thread for computation and search as the assignment 4 rules require.
         """
-        line = stdin.readline()
+        lines: queue.Queue = queue.Queue()
+        threading.Thread(target=self.read_commands, args=(lines,), daemon=True).start()
+        line = lines.get()
         while line:
             self.get_cmd(line)
+            line = lines.get()
+
+    def read_commands(self, lines: queue.Queue) -> None:
+        """
+        Pass every line of standard input on to the connection,
+        stopping the engine's search as soon as a stop command is read.
+        An empty line marks the end of the input.
+        """
+        line = stdin.readline()
+        while line:
+            if re.sub("^\d+", "", line).split()[:1] == ["stop"]:
+                self.engine.stop()
+            lines.put(line)
             line = stdin.readline()
+        lines.put("")
 
     def get_cmd(self, command: str) -> None:
         """
@@ -166,6 +190,7 @@ class GtpConnection:
         Reset the board to empty board of given size
         """
         self.board.reset(size)
+        self.engine.new_game()
 
     def board2d(self) -> str:
         return str(GoBoardUtil.get_twoD_board(self.board))
@@ -376,6 +401,17 @@ class GtpConnection:
         else:
             self.respond(winner + " " + winning_move)
 
+    def stop_cmd(self, args: List[str]) -> None:
+        """
+        Stop the engine's running search; it ends at its next check and
+        answers with what it has. The stop itself happens in read_commands,
+        when the command is read, and is kept pending in case the search it
+        is meant for had not started yet. Every command read before this one
+        has run by now, so the pending stop is dropped here.
+        """
+        self.engine.clear_stop()
+        self.respond()
+
 def point_to_coord(point: GO_POINT, boardsize: int) -> Tuple[int, int]:
     """
     Transform point given as board array index 
@@ -0,0 +1,91 @@
+import numpy as np
+
+"""
+Kinds of bound a stored value can be. An alphabeta search knows the exact
+value only if it fell between alpha and beta; after a beta cutoff the value
+is a lower bound, and if no move raised alpha it is an upper bound.
+"""
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+"""
+Bytes per entry: key, value, move, depth, bound and age.
+"""
+ENTRY_BYTES = 8 + 4 + 4 + 2 + 1 + 1
+DEFAULT_SIZE_MB = 64
+
+class TranspositionTable(object):
+    """
+    Fixed-size table stored in parallel NumPy arrays, one per entry field,
+    so memory use is known in advance and a lookup does not allocate.
+    Entries come in buckets of two, indexed by the low bits of the code:
+    the first slot is depth-preferred, it is only replaced by a result
+    that is at least as deep or when it is left from an older age;
+    the second slot always takes the results the first one turns down.
+    The table is meant to live through a whole game: newSearch starts
+    a new age at every genmove or solve, so entries left from earlier
+    moves are still found but give way to the current search.
+    """
+
+    def __init__(self, sizeMB=DEFAULT_SIZE_MB):
+        numBuckets = 1
+        while numBuckets * 4 * ENTRY_BYTES <= sizeMB * 2**20:
+            numBuckets *= 2
+        self.mask = numBuckets - 1
+        self.sizeMB = sizeMB
+        self.age = 0
+        numEntries = 2 * numBuckets
+        self.keys = np.zeros(numEntries, dtype=np.uint64)
+        self.values = np.zeros(numEntries, dtype=np.int32)
+        self.moves = np.zeros(numEntries, dtype=np.int32)
+        self.depths = np.full(numEntries, -1, dtype=np.int16)    # -1 marks an empty slot
+        self.bounds = np.zeros(numEntries, dtype=np.int8)
+        self.ages = np.zeros(numEntries, dtype=np.uint8)
+
+    def clear(self):
+        self.depths.fill(-1)
+        self.age = 0
+
+    def newSearch(self):
+        self.age = (self.age + 1) % 256
+
+    def __len__(self):
+        return int(np.count_nonzero(self.depths >= 0))
+
+    # Used to print a summary of the table with print(tt)
+    def __repr__(self):
+        return "TranspositionTable({} of {} entries, {} MB)".format(
+            len(self), len(self.keys), self.sizeMB)
+
+    def probe(self, code):
+        """
+        Index of the slot holding code, -1 if code is not in the table.
+        """
+        slot = (code & self.mask) << 1
+        if self.keys[slot] == code and self.depths[slot] >= 0:
+            return slot
+        slot += 1
+        if self.keys[slot] == code and self.depths[slot] >= 0:
+            return slot
+        return -1
+
+    def store(self, code, value, move, depth, bound):
+        slot = (code & self.mask) << 1
+        if self.keys[slot] != code and depth < self.depths[slot] and self.ages[slot] == self.age:
+            slot += 1
+        self.keys[slot] = code
+        self.values[slot] = value
+        self.moves[slot] = -1 if move is None else move
+        self.bounds[slot] = bound
+        self.ages[slot] = self.age
+        self.depths[slot] = depth
+    
+    # Returns (value, move, depth, bound), or 'None' if code is not in the table
+    def lookup(self, code):
+        slot = self.probe(code)
+        if slot < 0:
+            return None
+        move = self.moves[slot]
+        return (int(self.values[slot]), None if move < 0 else move,
+                int(self.depths[slot]), int(self.bounds[slot]))
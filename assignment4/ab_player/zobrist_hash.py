@@ -0,0 +1,60 @@
+import random
+from board_base import (
+    board_array_size,
+    BLACK,
+    WHITE,
+    BORDER
+)
+
+class ZobristHash:
+    """
+    Random code tables for Zobrist hashing.
+    GoBoard keeps a running code of its stones and XORs entries of these
+    tables in and out as stones are placed, captured and restored.
+    Side to move and both capture counters are mixed in when the full
+    code is read, so that they are covered by the key as well.
+    """
+    def __init__(self, boardSize):
+        self.boardSize = boardSize
+        self.numPoints = board_array_size(boardSize)
+        # one code per point and color, EMPTY and BORDER do not change the code
+        self.zArray = []
+        for _ in range(self.numPoints):
+            self.zArray.append([0, random.getrandbits(64), random.getrandbits(64), 0])
+        self.whiteToPlay = random.getrandbits(64)
+        # one code per capture count and color, indexed by color like zArray
+        self.captureArray = [[0] * self.numPoints]
+        for _ in range(2):
+            self.captureArray.append([random.getrandbits(64) for _ in range(self.numPoints)])
+
+    def positionCode(self, stonesCode, toPlay, blackCaptures, whiteCaptures):
+        """
+        Combine the running code of the stones with side to move and captures
+        """
+        code = stonesCode ^ self.captureArray[BLACK][blackCaptures % self.numPoints] \
+                          ^ self.captureArray[WHITE][whiteCaptures % self.numPoints]
+        if toPlay == WHITE:
+            code ^= self.whiteToPlay
+        return code
+
+    # Computes the hash value of a given board from scratch
+    def computeHash(self, gameState):
+        stonesCode = 0
+        for point in range(self.numPoints):
+            color = gameState.get_color(point)
+            if color != BORDER:
+                stonesCode ^= self.zArray[point][color]
+        return self.positionCode(stonesCode, gameState.current_player,
+                                 gameState.black_captures, gameState.white_captures)
+
+
+_hashers = {}
+
+def get_hasher(boardSize):
+    """
+    Return the ZobristHash shared by all boards of the given size,
+    so that codes of different boards and searches can be compared.
+    """
+    if boardSize not in _hashers:
+        _hashers[boardSize] = ZobristHash(boardSize)
+    return _hashers[boardSize]
@@ -12,11 +12,12 @@ from board_util import GoBoardUtil
 from engine import GoEngine
 import time
 import random
-from node import Node, PreRootNode
+import numpy as np
+from mcts_tree import MCTSTree
+from batch_playout import simulate_batch
 
 # timelimit
-from signal_handler import timeout_handler
-import signal
+from search_control import SearchControl
 
 from board_base import (
     BLACK,
@@ -57,31 +58,42 @@ class A4SubmissionPlayer(GoEngine):
         """
         GoEngine.__init__(self, "Go0", 1.0)
         self.time_limit = 55    # TODO: Need to give it a few more second to be safe
-        signal.signal(signal.SIGALRM, timeout_handler)
+        # one MCTS iteration is a whole playout, so look at the clock after each one
+        self.control = SearchControl(checkInterval=1)
+        # search tree kept from move to move, its root follows the game
+        self.mcts = None
 
     def set_time_limit(self, time_limit):
         self.time_limit = time_limit
 
+    def new_game(self) -> None:
+        self.mcts = None
+
+    def play_move(self, point: GO_POINT, color: GO_COLOR) -> None:
+        if self.mcts is not None and not self.mcts.advance(point, color):
+            self.mcts = None
+
+    def stop(self) -> None:
+        self.control.stop()
+
+    def clear_stop(self) -> None:
+        self.control.clearStop()
+
     def get_move(self, board: GoBoard, color: GO_COLOR) -> GO_POINT:
         """
         Implement for assignment 4
         Returns the best move
         """
         color = self.color_to_int(color)
-        mcts = MCTSUCT(board, color)
-        try:
-            signal.alarm(self.time_limit)    # set time_limit alarm
-            mcts.genmove()
-            # use solver to get move
-        except TimeoutError:
-            # what to do after time expires
-            pass
-        else:
-            signal.alarm(0)    # disable timelimit alarm
-        finally:
-            move_pt = mcts.get_best_move()
-            move_coord = format_point(point_to_coord(move_pt, board.size)).lower()
-            return move_coord
+        mcts = self.mcts
+        if mcts is None or not mcts.matches(board, color):
+            mcts = MCTSUCT(board, color)
+            self.mcts = mcts
+        self.control.start(self.time_limit)
+        mcts.genmove(self.control)
+        move_pt = mcts.get_best_move()
+        move_coord = format_point(point_to_coord(move_pt, board.size)).lower()
+        return move_coord
     
     def color_to_int(self, c: str) -> int:
         """convert character to the appropriate integer code"""
@@ -89,56 +101,102 @@ class A4SubmissionPlayer(GoEngine):
         return color_to_int[c]
 
 class MCTSUCT:
+    """
+    Nodes only store their move: selection plays the moves of the path
+    on self.board, a copy of the root position, and backpropogation
+    undoes them, so the board is back at the root between iterations.
+    """
+    __slots__ = ('board', 'color', 'moves', 'tree', 'explorationConstant', 'numPlayouts')
+
     def __init__(self, board, color):
-        self.board = board
+        self.board = board.copy()
         self.color = color
         self.moves = self.board.get_empty_points()
-        self.root = Node(board, color, move=None, parent=PreRootNode())
+        self.tree = MCTSTree(color)
         # self.numSims = 10000
         self.explorationConstant = 1.41 #1.41 # 0.5 was okay
+        # playouts per iteration, more than one are played as one batch
+        self.numPlayouts = 1
 
-    def genmove(self):
-        while True:
+    def matches(self, board, color):
+        """
+        Whether the root of the tree is the position on board with color to play
+        """
+        return self.tree.color[0] == color \
+            and self.board.black_captures == board.black_captures \
+            and self.board.white_captures == board.white_captures \
+            and np.array_equal(self.board.board, board.board)
+
+    def advance(self, move, color):
+        """
+        Follow move by color: its child becomes the root and the rest of
+        the tree is dropped. Returns False if the root has no such child.
+        """
+        tree = self.tree
+        if tree.color[0] != color or not tree.isExpanded(0):
+            return False
+        first = int(tree.firstChild[0])
+        children = np.flatnonzero(tree.move[first:first + int(tree.numChildren[0])] == move)
+        if len(children) == 0:
+            return False
+        self.tree = tree.subtree(first + int(children[0]))
+        self.board.play_move(move, color)
+        self.board = self.board.copy()    # the new root position, with an empty journal
+        return True
+
+    def genmove(self, control):
+        """
+        Run MCTS iterations until control stops the search; iterations
+        always complete, so the tree statistics stay consistent
+        """
+        while not control.tick():
             node = self.selection()
             self.expansion(node)
             eval = self.simulation(node)
             self.backpropogation(node, eval)
     
     def get_best_move(self):
-        maxNode = None
-        if self.root.color == BLACK:
-            maxNode = True
-        else:
-            maxNode = False
-        try:
-            bestMove = self.root.bestMove(maxNode)
-        except ValueError:
-            bestMove = 'pass'
-        return bestMove
+        tree = self.tree
+        if not tree.isExpanded(0):
+            self.expansion(0)
+        if tree.numChildren[0] == 0:
+            return 'pass'
+        return int(tree.move[tree.mostVisitedChild(0)])
 
     def selection(self):
         # traversing through tree to get to leaf node
-        current = self.root
-        if current.color == BLACK:
+        tree = self.tree
+        current = 0
+        if tree.color[current] == BLACK:
             isMaxNode = True
         else:
             isMaxNode = False
-        while current.expanded:
-            bestMove = current.bestChild(self.explorationConstant, isMaxNode) # move selection based on tree policy
-            if bestMove is None: # reached a terminal node
+        while tree.isExpanded(current):
+            bestChild = tree.bestChild(current, self.explorationConstant, isMaxNode) # move selection based on tree policy
+            if bestChild is None: # reached a terminal node
                 return current
-            if bestMove not in current.children:
-                current.addChild(bestMove)
-            current = current.children[bestMove]
+            self.board.play_move(int(tree.move[bestChild]), int(tree.color[current]))
+            current = bestChild
             isMaxNode = not isMaxNode
         return current # reached leaf node
     
     def expansion(self, node):
-        node.expanded = True
+        self.tree.expand(node, self.board.get_empty_points())
     
     def simulation(self, node):
-        cboard = node.board.copy()
-        is_terminal, winner = cboard.copy().simulate(node.color)
+        """
+        Sum of the results of numPlayouts playouts from node,
+        1 for a black win, -1 for a white win and 0 for a draw
+        """
+        if self.numPlayouts > 1:
+            winners = simulate_batch(self.board, int(self.tree.color[node]), self.numPlayouts)
+            return int(np.count_nonzero(winners == BLACK)) - int(np.count_nonzero(winners == WHITE))
+        # the playout is played on the shared board and taken back
+        board = self.board
+        depth = len(board.journal)
+        is_terminal, winner = board.simulate(int(self.tree.color[node]))
+        while len(board.journal) > depth:
+            board.undo()
         if winner == BLACK:
             return 1
         elif winner == WHITE:
@@ -147,12 +205,10 @@ class MCTSUCT:
             return 0
 
     def backpropogation(self, node, eval):
-        current = node
-        while current.parent is not None:
-            current.incNumVisits()
-            current.setEval(eval)
-            current = current.parent
-            # eval = -eval
+        self.tree.update(node, eval, self.numPlayouts)
+        board = self.board
+        while len(board.journal) > 0: # back to the root
+            board.undo()
 
 def run() -> None:
     """
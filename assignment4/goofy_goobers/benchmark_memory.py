@@ -0,0 +1,164 @@
+"""
+benchmark_memory.py
+Measures the memory used per MCTS tree node.
+
+Grows an MCTSUCT tree from the empty board for a number of iterations,
+without tracing allocations, then reports the memory held by the tree
+arrays (MCTSTree.nbytes, including the part of the pool not used yet),
+the bytes per node in use, how much of the allocated capacity is filled,
+and how many iterations of tree would fit in the 1 GB limit. Nodes hold
+no boards: the search plays on one shared board, so the arrays are all
+the tree costs.
+
+For comparison the same tree is rebuilt in the two per-node layouts the
+arrays replaced, one object per expanded node, each with its own board
+copy: the original Node, with a __dict__ and dicts of child statistics
+keyed by moves, and the __slots__ Node with array('d') statistics.
+Their memory is summed with sys.getsizeof over the objects the nodes
+own. The shared board geometry and the undo journal of each board copy
+are not counted, so these figures are lower bounds.
+
+Usage: python3 benchmark_memory.py [boardsize] [iterations]
+"""
+import random
+import sys
+import time
+from array import array
+
+from board import GoBoard
+from board_base import BLACK
+from Ninuki import MCTSUCT
+
+
+class DictNode:
+    """
+    Node layout before __slots__: statistics in dicts keyed by moves
+    """
+    def __init__(self, board, color, move, moves, parent, index):
+        self.board = board
+        self.parent = parent
+        self.expanded = True
+        self.color = color
+        self.move = move
+        self.moves = moves
+        self.lenMoves = len(moves)
+        self.children = {}
+        self.childEvals = dict.fromkeys(moves, 0)
+        self.childVisits = dict.fromkeys(moves, 0)
+
+    def setStats(self, visits, valueSums):
+        for key, numVisits, valueSum in zip(list(self.childVisits), visits.tolist(), valueSums.tolist()):
+            if numVisits:
+                self.childVisits[key] = int(numVisits)
+                self.childEvals[key] = valueSum
+
+    def setChild(self, index, child):
+        self.children[self.moves[index]] = child
+
+
+class SlotsNode:
+    """
+    Node layout with __slots__: statistics in arrays indexed like moves
+    """
+    __slots__ = ('board', 'parent', 'index', 'expanded', 'color', 'move', 'moves', 'lenMoves',
+                 'children', 'childEvals', 'childVisits')
+
+    def __init__(self, board, color, move, moves, parent, index):
+        self.board = board
+        self.parent = parent
+        self.index = index
+        self.expanded = True
+        self.color = color
+        self.move = move
+        self.moves = moves
+        self.lenMoves = len(moves)
+        self.children = [None] * self.lenMoves
+        self.childEvals = array('d', bytes(8 * self.lenMoves))
+        self.childVisits = array('d', bytes(8 * self.lenMoves))
+
+    def setStats(self, visits, valueSums):
+        self.childVisits = array('d', visits.tolist())
+        self.childEvals = array('d', valueSums.tolist())
+
+    def setChild(self, index, child):
+        self.children[index] = child
+
+
+def owned_bytes(obj, seen: set) -> int:
+    """
+    sys.getsizeof summed over obj and everything it refers to
+    that is not in seen, which is updated with what was counted
+    """
+    total = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, '__dict__'):
+                stack.append(obj.__dict__)
+            for name in getattr(type(obj), '__slots__', ()):
+                if hasattr(obj, name):
+                    stack.append(getattr(obj, name))
+    return total
+
+
+def per_node_layout_bytes(tree, board, node_class):
+    """
+    Number of nodes and memory of tree rebuilt with one node_class
+    object per expanded node, each with a copy of board
+    """
+    seen = set()
+    owned_bytes(board, seen)    # shared by all the copies
+    nodes = {}
+    for node in range(tree.size):    # a parent always has a smaller id than its children
+        if not tree.isExpanded(node):
+            continue
+        board_copy = board.copy()
+        seen.add(id(board_copy.journal))
+        first = int(tree.firstChild[node])
+        end = first + int(tree.numChildren[node])
+        parent = nodes.get(int(tree.parent[node]))
+        index = node - int(tree.firstChild[tree.parent[node]]) if parent is not None else 0
+        nodes[node] = node_class(board_copy, int(tree.color[node]), int(tree.move[node]),
+                                 tree.move[first:end].copy(), parent, index)
+        nodes[node].setStats(tree.visits[first:end], tree.valueSum[first:end])
+        if parent is not None:
+            parent.setChild(index, nodes[node])
+    return len(nodes), owned_bytes(nodes[0], seen)
+
+
+def run() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    random.seed(455)
+    board = GoBoard(size)
+    start = time.time()
+    mcts = MCTSUCT(board, BLACK)
+    for _ in range(iterations):
+        node = mcts.selection()
+        mcts.expansion(node)
+        mcts.backpropogation(node, mcts.simulation(node))
+    elapsed = time.time() - start
+    tree = mcts.tree
+    print("{} iterations in {:.2f}s, {} of {} allocated nodes in use ({:.0%})".format(
+        iterations, elapsed, tree.size, tree.capacity, tree.size / tree.capacity))
+    layouts = [("MCTSTree arrays", tree.size, tree.nbytes())]
+    for name, node_class in [("__slots__ Node", SlotsNode), ("Node with dicts", DictNode)]:
+        layouts.append((name,) + per_node_layout_bytes(tree, mcts.board, node_class))
+    print("{:16} {:>7} {:>8} {:>11} {:>18}".format("layout", "nodes", "MB", "bytes/node", "iterations per GB"))
+    for name, num_nodes, tree_bytes in layouts:
+        print("{:16} {:7d} {:8.2f} {:11.0f} {:18.0f}".format(
+            name, num_nodes, tree_bytes / 2**20, tree_bytes / num_nodes, iterations * 2**30 / tree_bytes))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,110 @@
+"""
+benchmark_selection.py
+Measures UCT child selections per second on nodes with 49 children,
+the number of moves from the empty 7x7 board.
+
+A tree is filled with random child statistics, then MCTSTree.bestChild
+is timed against a plain Python loop over the same children, and the
+two are checked to pick the same child.
+To put the gain in context, it then times the phases of real MCTSUCT
+iterations from the empty board: selection is a small part of an
+iteration, the random playout is most of it.
+
+Usage: python3 benchmark_selection.py [children] [selections]
+"""
+import math
+import random
+import sys
+import time
+
+from board import GoBoard
+from board_base import BLACK
+from mcts_tree import MCTSTree
+from Ninuki import MCTSUCT
+
+NUM_NODES = 64
+EXPLORATION_CONSTANT = 1.41
+
+
+def python_best_child(tree: MCTSTree, node: int, maxNode: bool) -> int:
+    """ Per-child UCB loop, as selection did before it was vectorized """
+    first = int(tree.firstChild[node])
+    visits = tree.visits[first:first + int(tree.numChildren[node])].tolist()
+    values = tree.valueSum[first:first + int(tree.numChildren[node])].tolist()
+    logVisits = math.log(tree.visits[node] + 1)
+    best = None
+    bestValue = 0.0
+    for i in range(len(visits)):
+        Q = values[i] / (visits[i] + 1)
+        exploitTerm = EXPLORATION_CONSTANT * math.sqrt(logVisits / (visits[i] + 1))
+        value = Q + exploitTerm if maxNode else Q - exploitTerm
+        if best is None or (value > bestValue if maxNode else value < bestValue):
+            best, bestValue = i, value
+    return first + best
+
+
+def random_tree(num_children: int) -> MCTSTree:
+    """ Root with NUM_NODES expanded children, each with num_children children """
+    rng = random.Random(455)
+    tree = MCTSTree(BLACK)
+    tree.expand(0, list(range(NUM_NODES)))
+    for node in range(1, NUM_NODES + 1):
+        tree.expand(node, list(range(num_children)))
+        for child in tree.children(node):
+            tree.visits[child] = rng.randrange(200)
+            tree.valueSum[child] = rng.uniform(-1, 1) * tree.visits[child]
+        first = int(tree.firstChild[node])
+        tree.visits[node] = tree.visits[first:first + num_children].sum()
+    return tree
+
+
+def time_selections(select, tree: MCTSTree, selections: int) -> float:
+    start = time.time()
+    for i in range(selections):
+        select(tree, 1 + i % NUM_NODES, i % 2 == 0)
+    return selections / (time.time() - start)
+
+
+def iteration_shares(size: int, iterations: int):
+    """
+    Fractions of the time of MCTSUCT iterations spent in selection,
+    and in simulation (the playout)
+    """
+    random.seed(455)
+    mcts = MCTSUCT(GoBoard(size), BLACK)
+    selection = simulation = total = 0.0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        node = mcts.selection()
+        selected = time.perf_counter()
+        mcts.expansion(node)
+        expanded = time.perf_counter()
+        eval = mcts.simulation(node)
+        simulated = time.perf_counter()
+        mcts.backpropogation(node, eval)
+        selection += selected - start
+        simulation += simulated - expanded
+        total += time.perf_counter() - start
+    return selection / total, simulation / total
+
+
+def run() -> None:
+    num_children = int(sys.argv[1]) if len(sys.argv) > 1 else 49
+    selections = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    tree = random_tree(num_children)
+    for node in range(1, NUM_NODES + 1):
+        for maxNode in (True, False):
+            assert tree.bestChild(node, EXPLORATION_CONSTANT, maxNode) \
+                == python_best_child(tree, node, maxNode), "selections differ at node {}".format(node)
+    vectorized = time_selections(
+        lambda tree, node, maxNode: tree.bestChild(node, EXPLORATION_CONSTANT, maxNode), tree, selections)
+    loop = time_selections(python_best_child, tree, selections)
+    print("{} children: {:.0f} selections/s vectorized, {:.0f} selections/s python loop ({:.1f}x)".format(
+        num_children, vectorized, loop, vectorized / loop))
+    selection, simulation = iteration_shares(7, 1000)
+    print("MCTSUCT on 7x7: selection takes {:.0%} of an iteration, the playout {:.0%}; "
+          "the playout is the bottleneck, not selection".format(selection, simulation))
+
+
+if __name__ == "__main__":
+    run()
@@ -13,7 +13,7 @@ The board uses a 1-dimensional representation with padding
 
 import numpy as np
 import random
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from board_base import (
     board_array_size,
@@ -34,6 +34,178 @@ from board_base import (
 )
 
 
+class BoardGeometry(object):
+    """
+    Geometry of a board size that never changes during a game:
+    the empty board template, all rows, cols and diags
+    and neighbor and capture offsets.
+    One instance per size is shared by all boards of that size,
+    see get_geometry.
+    """
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        self.NS: int = size + 1
+        self.maxpoint: int = board_array_size(size)
+        self.empty_board: np.ndarray = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
+        for row in range(1, size + 1):
+            start: int = row * self.NS + 1
+            self.empty_board[start : start + size] = EMPTY
+        self.empty_board.flags.writeable = False
+        # all points on the board, and the position of each in that array
+        self.board_points: np.ndarray = where1d(self.empty_board == EMPTY).astype(GO_POINT)
+        self.board_points.flags.writeable = False
+        self.board_point_index: np.ndarray = np.full(self.maxpoint, -1, dtype=GO_POINT)
+        self.board_point_index[self.board_points] = np.arange(len(self.board_points))
+        self.board_point_index.flags.writeable = False
+        self.neighbor_offsets = (-1, 1, -self.NS, self.NS)
+        self.diag_neighbor_offsets = (-self.NS - 1, -self.NS + 1, self.NS - 1, self.NS + 1)
+        self.capture_offsets = (1, -1, self.NS, -self.NS, self.NS+1, -(self.NS+1), self.NS-1, -self.NS+1)
+        self.rows, self.cols, self.diags = self._calculate_rows_cols_diags()
+        self.lines = self.rows + self.cols + self.diags
+        self.neighbors, self.diag_neighbors, self.capture_rays, self.five_rays = self._calculate_point_tables()
+
+    def _walk(self, start: int, step: int) -> Tuple[int, ...]:
+        line = []
+        pt = start
+        while self.empty_board[pt] == EMPTY:
+            line.append(pt)
+            pt += step
+        return tuple(line)
+
+    def _calculate_point_tables(self) -> Tuple[tuple, tuple, tuple, tuple]:
+        """
+        Tables indexed by point, empty for points off the board:
+        - the four neighbors and the four diagonal neighbors
+        - the capture rays, one (stone, stone, bracketing point) triple
+          for each of the eight directions that fits on the board
+        - the five rays, one (forward, backward) pair of point tuples for
+          each of the four lines through the point, up to four points long
+        """
+        def on_board(pt: int) -> bool:
+            return 0 <= pt < self.maxpoint and self.empty_board[pt] == EMPTY
+
+        def ray(pt: int, step: int, length: int) -> Tuple[int, ...]:
+            points = []
+            while len(points) < length and on_board(pt + step):
+                pt += step
+                points.append(pt)
+            return tuple(points)
+
+        neighbors = []
+        diag_neighbors = []
+        capture_rays = []
+        five_rays = []
+        for point in range(self.maxpoint):
+            if not on_board(point):
+                for table in (neighbors, diag_neighbors, capture_rays, five_rays):
+                    table.append(())
+                continue
+            neighbors.append(tuple(point + offset for offset in self.neighbor_offsets))
+            diag_neighbors.append(tuple(point + offset for offset in self.diag_neighbor_offsets))
+            rays = (ray(point, offset, 3) for offset in self.capture_offsets)
+            capture_rays.append(tuple(r for r in rays if len(r) == 3))
+            five_rays.append(tuple((ray(point, step, 4), ray(point, -step, 4))
+                                   for step in (1, self.NS, self.NS + 1, self.NS - 1)))
+        return tuple(neighbors), tuple(diag_neighbors), tuple(capture_rays), tuple(five_rays)
+
+    def _calculate_rows_cols_diags(self) -> Tuple[tuple, tuple, tuple]:
+        if self.size < 5:
+            return (), (), ()
+        # precalculate all rows, cols, and diags for 5-in-a-row detection
+        rows = []
+        cols = []
+        for i in range(1, self.size + 1):
+            rows.append(self._walk(i * self.NS + 1, 1))
+            cols.append(self._walk(self.NS + i, self.NS))
+        diags = []
+        # diag towards SE, starting from first row (1,1) moving right to (1,n)
+        # diag towards SE and NE, starting from (2,1) downwards to (n,1)
+        # diag towards NE, starting from (n,2) moving right to (n,n)
+        first_row = [self.NS + i for i in range(1, self.size + 1)]
+        first_col = [row * self.NS + 1 for row in range(2, self.size + 1)]
+        last_row = [self.size * self.NS + i for i in range(2, self.size + 1)]
+        for start in first_row:
+            diags.append(self._walk(start, self.NS + 1))
+        for start in first_col:
+            diags.append(self._walk(start, self.NS + 1))
+            diags.append(self._walk(start, -self.NS + 1))
+        for start in last_row:
+            diags.append(self._walk(start, -self.NS + 1))
+        diags = [d for d in diags if len(d) >= 5]
+        assert len(rows) == self.size
+        assert len(cols) == self.size
+        assert len(diags) == (2 * (self.size - 5) + 1) * 2
+        return tuple(rows), tuple(cols), tuple(diags)
+
+
+_geometries: Dict[int, BoardGeometry] = {}
+
+def get_geometry(size: int) -> BoardGeometry:
+    """
+    Return the BoardGeometry shared by all boards of the given size.
+    """
+    if size not in _geometries:
+        _geometries[size] = BoardGeometry(size)
+    return _geometries[size]
+
+
+class MoveJournal(object):
+    """
+    Undo journal for make/unmake, stored in one preallocated integer array.
+    Each entry holds the point and color of a move, the capture counts
+    and last moves from before the move, and the stones it captured.
+    The array is allocated once for the longest possible game, so playing
+    and undoing moves does not allocate.
+    """
+    POINT, COLOR, BLACK_CAPTURES, WHITE_CAPTURES, LAST_MOVE, LAST2_MOVE, NUM_CAPTURED = range(7)
+    CAPTURED = 7
+    MAX_CAPTURED = 16    # two stones in each of the eight directions
+
+    __slots__ = ('entries', 'size')
+
+    def __init__(self, board_size: int) -> None:
+        self.entries: np.ndarray = np.empty((self.max_moves(board_size), self.CAPTURED + self.MAX_CAPTURED),
+                                            dtype=np.int32)
+        self.size: int = 0
+
+    @staticmethod
+    def max_moves(board_size: int) -> int:
+        """
+        Most moves a game can last: one per point, plus one per stone
+        captured before the last move. Both players have captured fewer
+        than 10 stones until then, so that is at most 8 stones each.
+        """
+        return board_size * board_size + 2 * 8
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, point: GO_POINT, color: GO_COLOR, black_captures: int, white_captures: int,
+             last_move: GO_POINT, last2_move: GO_POINT) -> None:
+        if self.size == len(self.entries):
+            # only when moves go on being played after the end of the game
+            self.entries = np.concatenate((self.entries, np.empty_like(self.entries)))
+        self.entries[self.size, : self.CAPTURED] = (point, color, black_captures, white_captures,
+                                                   last_move, last2_move, 0)
+        self.size += 1
+
+    def add_captured(self, point: GO_POINT) -> None:
+        """
+        Record a stone captured by the last pushed move
+        """
+        entry = self.entries[self.size - 1]
+        entry[self.CAPTURED + entry[self.NUM_CAPTURED]] = point
+        entry[self.NUM_CAPTURED] += 1
+
+    def pop(self) -> int:
+        """
+        Remove the last entry and return its row in self.entries, which
+        holds it until the next push. Read its fields with entries.item(row, field).
+        """
+        self.size -= 1
+        return self.size
+
+
 """
 The GoBoard class implements a board and basic functions to play
 moves, check the end of the game, and count the acore at the end.
@@ -44,79 +216,17 @@ The board is stored as a one-dimensional array of GO_POINT in self.board.
 See coord_to_point for explanations of the array encoding.
 """
 class GoBoard(object):
+    # fixed attributes instead of a __dict__, which makes copy() cheaper
+    __slots__ = ('size', 'NS', 'WE', 'last_move', 'last2_move', 'current_player',
+                 'geometry', 'maxpoint', 'board', 'empty_points', 'empty_index', 'num_empty',
+                 'rows', 'cols', 'diags', 'black_captures', 'white_captures', 'journal')
+
     def __init__(self, size: int) -> None:
         """
         Creates a Go board of given size
         """
         assert 2 <= size <= MAXSIZE
         self.reset(size)
-        self.calculate_rows_cols_diags()
-        self.black_captures = 0
-        self.white_captures = 0
-        self.depth = 0
-        self.black_capture_history = []
-        self.white_capture_history = []
-        self.move_history = []
-    
-    def calculate_rows_cols_diags(self) -> None:
-        if self.size < 5:
-            return
-        # precalculate all rows, cols, and diags for 5-in-a-row detection
-        self.rows = []
-        self.cols = []
-        for i in range(1, self.size + 1):
-            current_row = []
-            start = self.row_start(i)
-            for pt in range(start, start + self.size):
-                current_row.append(pt)
-            self.rows.append(current_row)
-            
-            start = self.row_start(1) + i - 1
-            current_col = []
-            for pt in range(start, self.row_start(self.size) + i, self.NS):
-                current_col.append(pt)
-            self.cols.append(current_col)
-        
-        self.diags = []
-        # diag towards SE, starting from first row (1,1) moving right to (1,n)
-        start = self.row_start(1)
-        for i in range(start, start + self.size):
-            diag_SE = []
-            pt = i
-            while self.get_color(pt) == EMPTY:
-                diag_SE.append(pt)
-                pt += self.NS + 1
-            if len(diag_SE) >= 5:
-                self.diags.append(diag_SE)
-        # diag towards SE and NE, starting from (2,1) downwards to (n,1)
-        for i in range(start + self.NS, self.row_start(self.size) + 1, self.NS):
-            diag_SE = []
-            diag_NE = []
-            pt = i
-            while self.get_color(pt) == EMPTY:
-                diag_SE.append(pt)
-                pt += self.NS + 1
-            pt = i
-            while self.get_color(pt) == EMPTY:
-                diag_NE.append(pt)
-                pt += -1 * self.NS + 1
-            if len(diag_SE) >= 5:
-                self.diags.append(diag_SE)
-            if len(diag_NE) >= 5:
-                self.diags.append(diag_NE)
-        # diag towards NE, starting from (n,2) moving right to (n,n)
-        start = self.row_start(self.size) + 1
-        for i in range(start, start + self.size):
-            diag_NE = []
-            pt = i
-            while self.get_color(pt) == EMPTY:
-                diag_NE.append(pt)
-                pt += -1 * self.NS + 1
-            if len(diag_NE) >=5:
-                self.diags.append(diag_NE)
-        assert len(self.rows) == self.size
-        assert len(self.cols) == self.size
-        assert len(self.diags) == (2 * (self.size - 5) + 1) * 2
 
     def add_two_captures(self, color: GO_COLOR) -> None:
         if color == BLACK:
@@ -140,31 +250,31 @@ class GoBoard(object):
         self.last_move: GO_POINT = NO_POINT
         self.last2_move: GO_POINT = NO_POINT
         self.current_player: GO_COLOR = BLACK
-        self.maxpoint: int = board_array_size(size)
-        self.board: np.ndarray[GO_POINT] = np.full(self.maxpoint, BORDER, dtype=GO_POINT)
-        self._initialize_empty_points(self.board)
+        self.geometry: BoardGeometry = get_geometry(size)
+        self.maxpoint: int = self.geometry.maxpoint
+        self.board: np.ndarray[GO_POINT] = self.geometry.empty_board.copy()
+        # set of empty points: dense array of the points, and each point's index in it
+        self.empty_points: np.ndarray[GO_POINT] = self.geometry.board_points.copy()
+        self.empty_index: np.ndarray[GO_POINT] = self.geometry.board_point_index.copy()
+        self.num_empty: int = len(self.empty_points)
+        self.rows = self.geometry.rows
+        self.cols = self.geometry.cols
+        self.diags = self.geometry.diags
         self.black_captures = 0
         self.white_captures = 0
-        self.depth = 0
-        self.black_capture_history = []
-        self.white_capture_history = []
-        self.move_history = []
+        self.journal = MoveJournal(size)
 
     def copy(self) -> 'GoBoard':
-        b = GoBoard(self.size)
-        assert b.NS == self.NS
-        assert b.WE == self.WE
-        b.last_move = self.last_move
-        b.last2_move = self.last2_move
-        b.current_player = self.current_player
-        assert b.maxpoint == self.maxpoint
-        b.board = np.copy(self.board)
-        b.black_captures = self.black_captures
-        b.white_captures = self.white_captures
-        b.depth = self.depth
-        b.black_capture_history = self.black_capture_history.copy()
-        b.white_capture_history = self.white_capture_history.copy()
-        b.move_history = self.move_history.copy()
+        """
+        Copies the mutable state, the geometry is shared with the copy.
+        """
+        b = GoBoard.__new__(GoBoard)
+        for name in GoBoard.__slots__:
+            setattr(b, name, getattr(self, name))
+        b.board = self.board.copy()
+        b.empty_points = self.empty_points.copy()
+        b.empty_index = self.empty_index.copy()
+        b.journal = MoveJournal(self.size)
         return b
 
     def get_color(self, point: GO_POINT) -> GO_COLOR:
@@ -187,14 +297,39 @@ class GoBoard(object):
         return self.board[point] == EMPTY
 
     def end_of_game(self) -> bool:
-        return self.get_empty_points().size == 0 or (self.last_move == PASS and self.last2_move == PASS)
+        return self.num_empty_points() == 0 or (self.last_move == PASS and self.last2_move == PASS)
            
     def get_empty_points(self) -> np.ndarray:
         """
         Return:
             The empty points on the board
         """
-        return where1d(self.board == EMPTY)
+        return np.sort(self.empty_points[:self.num_empty])
+
+    def num_empty_points(self) -> int:
+        return self.num_empty
+
+    def random_empty_point(self) -> GO_POINT:
+        """
+        Return an empty point chosen uniformly at random.
+        """
+        return self.empty_points[random.randrange(self.num_empty)]
+
+    def _remove_empty_point(self, point: GO_POINT) -> None:
+        """
+        Remove point from the empty point set by moving the last
+        empty point into its slot.
+        """
+        i = self.empty_index[point]
+        self.num_empty -= 1
+        last = self.empty_points[self.num_empty]
+        self.empty_points[i] = last
+        self.empty_index[last] = i
+
+    def _add_empty_point(self, point: GO_POINT) -> None:
+        self.empty_points[self.num_empty] = point
+        self.empty_index[point] = self.num_empty
+        self.num_empty += 1
 
     def row_start(self, row: int) -> int:
         assert row >= 1
@@ -219,48 +354,50 @@ class GoBoard(object):
         """
         if self.board[point] != EMPTY:
             return False
+        self.journal.push(point, color, self.black_captures, self.white_captures,
+                          self.last_move, self.last2_move)
         self.board[point] = color
+        self._remove_empty_point(point)
         self.current_player = opponent(color)
         self.last2_move = self.last_move
         self.last_move = point
         O = opponent(color)
-        offsets = [1, -1, self.NS, -self.NS, self.NS+1, -(self.NS+1), self.NS-1, -self.NS+1]
-        bcs = []
-        wcs = []
-        for offset in offsets:
-            if self.board[point+offset] == O and self.board[point+(offset*2)] == O and self.board[point+(offset*3)] == color:
-                self.board[point+offset] = EMPTY
-                self.board[point+(offset*2)] = EMPTY
+        board = self.board
+        for p1, p2, end in self.geometry.capture_rays[point]:
+            if board[p1] == O and board[p2] == O and board[end] == color:
+                board[p1] = EMPTY
+                board[p2] = EMPTY
+                self._add_empty_point(p1)
+                self._add_empty_point(p2)
+                self.journal.add_captured(p1)
+                self.journal.add_captured(p2)
                 if color == BLACK:
                     self.black_captures += 2
-                    bcs.append(point+offset)
-                    bcs.append(point+(offset*2))
                 else:
                     self.white_captures += 2
-                    wcs.append(point+offset)
-                    wcs.append(point+(offset*2))
-        self.depth += 1
-        self.black_capture_history.append(bcs)
-        self.white_capture_history.append(wcs)
-        self.move_history.append(point)
         return True
     
-    def undo(self):
-        self.board[self.move_history.pop()] = EMPTY
-        self.current_player = opponent(self.current_player)
-        self.depth -= 1
-        bcs = self.black_capture_history.pop()
-        for point in bcs:
-            self.board[point] = WHITE
-            self.black_captures -= 1
-        wcs = self.white_capture_history.pop()
-        for point in wcs:
-            self.board[point] = BLACK
-            self.white_captures -= 1
-        if len(self.move_history) > 0:
-            self.last_move = self.move_history[-1]
-        if len(self.move_history) > 1:
-            self.last2_move = self.move_history[-2]
+    def undo(self) -> None:
+        """
+        Takes back the last move played, with the stones it captured.
+        """
+        row = self.journal.pop()
+        item = self.journal.entries.item
+        point = item(row, MoveJournal.POINT)
+        color = item(row, MoveJournal.COLOR)
+        self.black_captures = item(row, MoveJournal.BLACK_CAPTURES)
+        self.white_captures = item(row, MoveJournal.WHITE_CAPTURES)
+        self.last_move = item(row, MoveJournal.LAST_MOVE)
+        self.last2_move = item(row, MoveJournal.LAST2_MOVE)
+        num_captured = item(row, MoveJournal.NUM_CAPTURED)
+        self.board[point] = EMPTY
+        self._add_empty_point(point)
+        O = opponent(color)
+        for i in range(MoveJournal.CAPTURED, MoveJournal.CAPTURED + num_captured):
+            p = item(row, i)
+            self.board[p] = O
+            self._remove_empty_point(p)
+        self.current_player = color
 
     def neighbors_of_color(self, point: GO_POINT, color: GO_COLOR) -> List:
         """ List of neighbors of point of given color """
@@ -270,16 +407,36 @@ class GoBoard(object):
                 nbc.append(nb)
         return nbc
 
-    def _neighbors(self, point: GO_POINT) -> List:
-        """ List of all four neighbors of the point """
-        return [point - 1, point + 1, point - self.NS, point + self.NS]
+    def _neighbors(self, point: GO_POINT) -> Tuple:
+        """ All four neighbors of the point """
+        return self.geometry.neighbors[point]
 
-    def _diag_neighbors(self, point: GO_POINT) -> List:
-        """ List of all four diagonal neighbors of point """
-        return [point - self.NS - 1,
-                point - self.NS + 1,
-                point + self.NS - 1,
-                point + self.NS + 1]
+    def _diag_neighbors(self, point: GO_POINT) -> Tuple:
+        """ All four diagonal neighbors of point """
+        return self.geometry.diag_neighbors[point]
+
+    def five_in_a_row_at(self, point: GO_POINT) -> GO_COLOR:
+        """
+        Returns the color of a five in a row through the stone on point,
+        EMPTY if there is none.
+        """
+        board = self.board
+        color = board[point]
+        if color != BLACK and color != WHITE:
+            return EMPTY
+        for forward, backward in self.geometry.five_rays[point]:
+            count = 1
+            for p in forward:
+                if board[p] != color:
+                    break
+                count += 1
+            for p in backward:
+                if board[p] != color:
+                    break
+                count += 1
+            if count >= 5:
+                return color
+        return EMPTY
 
     def last_board_moves(self) -> List:
         """
@@ -299,23 +456,10 @@ class GoBoard(object):
         EMPTY otherwise.
         Checks the entire board.
         """
-        for point in range(self.maxpoint):
-            c = self.board[point]
-            if c != BLACK and c != WHITE:
-                continue
-            for offset in [(1, 0), (0, 1), (1, 1), (1, -1)]:
-                i = 1
-                num_found = 1
-                while self.board[point + i * offset[0] * self.NS + i * offset[1]] == c:
-                    i += 1
-                    num_found += 1
-                i = -1
-                while self.board[point + i * offset[0] * self.NS + i * offset[1]] == c:
-                    i -= 1
-                    num_found += 1
-                if num_found >= 5:
-                    return c
-        
+        for point in self.geometry.board_points:
+            c = self.five_in_a_row_at(point)
+            if c != EMPTY:
+                return c
         return EMPTY
     
     def detect_five_in_a_row(self) -> GO_COLOR:
@@ -326,21 +470,7 @@ class GoBoard(object):
         """
         if self.last_move == NO_POINT or self.last_move == PASS:
             return EMPTY
-        c = self.board[self.last_move]
-        for offset in [(1, 0), (0, 1), (1, 1), (1, -1)]:
-            i = 1
-            num_found = 1
-            while self.board[self.last_move + i * offset[0] * self.NS + i * offset[1]] == c:
-                i += 1
-                num_found += 1
-            i = -1
-            while self.board[self.last_move + i * offset[0] * self.NS + i * offset[1]] == c:
-                i -= 1
-                num_found += 1
-            if num_found >= 5:
-                return c
-        
-        return EMPTY
+        return self.five_in_a_row_at(self.last_move)
 
     def is_terminal(self):
         """
@@ -377,31 +507,12 @@ class GoBoard(object):
         return state
     
     def endOfGame(self) -> bool:
-        return self.get_empty_points().size == 0\
+        return self.num_empty_points() == 0\
             or self.detect_five_in_a_row() != EMPTY\
             or self.black_captures >= 10\
             or self.white_captures >= 10\
             or self.end_of_game()
     
-    def detect_five_in_a_row(self) -> GO_COLOR:
-        """
-        Returns BLACK or WHITE if any five in a row is detected for the color
-        EMPTY otherwise.
-        """
-        for r in self.rows:
-            result = self.has_five_in_list(r)
-            if result != EMPTY:
-                return result
-        for c in self.cols:
-            result = self.has_five_in_list(c)
-            if result != EMPTY:
-                return result
-        for d in self.diags:
-            result = self.has_five_in_list(d)
-            if result != EMPTY:
-                return result
-        return EMPTY
-
     def has_five_in_list(self, list) -> GO_COLOR:
         """
         Returns BLACK or WHITE if any five in a rows exist in the list.
@@ -435,9 +546,8 @@ class GoBoard(object):
         to_play = color
         if not self.endOfGame():
             while not self.endOfGame():
-                all_moves = self.get_empty_points()
                 to_play = opponent(to_play)
-                self.play_move(random.choice(all_moves), to_play)
+                self.play_move(self.random_empty_point(), to_play)
 
         return self.is_terminal()
     
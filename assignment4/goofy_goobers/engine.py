@@ -19,4 +19,31 @@ class GoEngine:
         version : version number used by the GTP interface
         """
         pass
-        
\ No newline at end of file
+
+    def new_game(self) -> None:
+        """
+        Called when the board is cleared or resized, so the engine can
+        drop anything it kept from the previous game
+        """
+        pass
+
+    def play_move(self, point: GO_POINT, color: int) -> None:
+        """
+        Called after each move played on the GTP board, by play or
+        genmove, so the engine can follow the game
+        """
+        pass
+
+    def stop(self) -> None:
+        """
+        Called by the GTP stop command, possibly while get_move or
+        solve_board is running, to end the search early
+        """
+        pass
+
+    def clear_stop(self) -> None:
+        """
+        Called when the GTP stop command is executed, after every command
+        read before it, to drop a stop that found no search to end
+        """
+        pass
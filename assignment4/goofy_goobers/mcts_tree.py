@@ -0,0 +1,155 @@
+import math
+import numpy as np
+from board_base import NO_POINT, opponent
+
+"""
+Number of nodes the tree arrays grow by whenever they are full
+"""
+BLOCK_SIZE = 1 << 16
+
+"""
+Node id meaning no node: the parent of the root, the first child of
+a node that is not expanded
+"""
+NO_NODE = -1
+
+class MCTSTree(object):
+    """
+    MCTS tree stored in NumPy arrays indexed by integer node ids,
+    one entry per node in each array. Node 0 is the root.
+    Expanding a node creates all its children at once, one per move,
+    with consecutive ids firstChild[node] .. firstChild[node] + numChildren[node] - 1,
+    so the statistics of the children of a node are one slice of each array.
+    visits and valueSum of a node are the statistics its parent selects by.
+    The arrays grow by BLOCK_SIZE nodes at a time.
+    """
+    __slots__ = ('size', 'capacity', 'visits', 'valueSum', 'firstChild', 'numChildren',
+                 'move', 'parent', 'color')
+
+    def __init__(self, rootColor, capacity=BLOCK_SIZE):
+        self.size = 0
+        self.capacity = capacity
+        self.visits = np.zeros(capacity, dtype=np.float64)
+        self.valueSum = np.zeros(capacity, dtype=np.float64)
+        self.firstChild = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.numChildren = np.zeros(capacity, dtype=np.int32)
+        self.move = np.full(capacity, NO_POINT, dtype=np.int32)
+        self.parent = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.color = np.zeros(capacity, dtype=np.int8)    # color to play at the node
+        self.size = 1
+        self.color[0] = rootColor
+
+    def _grow(self, numNodes):
+        """
+        Make room for numNodes more nodes
+        """
+        capacity = self.capacity
+        while self.size + numNodes > capacity:
+            capacity += BLOCK_SIZE
+        extra = capacity - self.capacity
+        self.visits = np.concatenate((self.visits, np.zeros(extra, dtype=np.float64)))
+        self.valueSum = np.concatenate((self.valueSum, np.zeros(extra, dtype=np.float64)))
+        self.firstChild = np.concatenate((self.firstChild, np.full(extra, NO_NODE, dtype=np.int32)))
+        self.numChildren = np.concatenate((self.numChildren, np.zeros(extra, dtype=np.int32)))
+        self.move = np.concatenate((self.move, np.full(extra, NO_POINT, dtype=np.int32)))
+        self.parent = np.concatenate((self.parent, np.full(extra, NO_NODE, dtype=np.int32)))
+        self.color = np.concatenate((self.color, np.zeros(extra, dtype=np.int8)))
+        self.capacity = capacity
+
+    def isExpanded(self, node):
+        return self.firstChild[node] != NO_NODE
+
+    def expand(self, node, moves):
+        """
+        Create one child of node for each of moves, with zero statistics
+        """
+        numMoves = len(moves)
+        if self.size + numMoves > self.capacity:
+            self._grow(numMoves)
+        first = self.size
+        end = first + numMoves
+        self.firstChild[node] = first
+        self.numChildren[node] = numMoves
+        self.move[first:end] = moves
+        self.parent[first:end] = node
+        self.color[first:end] = opponent(int(self.color[node]))
+        self.size = end
+
+    def children(self, node):
+        """
+        The ids of the children of node, as a range
+        """
+        first = int(self.firstChild[node])
+        return range(first, first + int(self.numChildren[node]))
+
+    def bestChild(self, node, explorationConstant, maxNode):
+        """
+        Child of an expanded node to follow by UCT, None if node has no children.
+        The UCB values of all children are computed at once on their slices.
+        """
+        first = int(self.firstChild[node])
+        end = first + int(self.numChildren[node])
+        if end == first:
+            return None # is terminal node
+        visits = self.visits[first:end] + 1
+        Q = self.valueSum[first:end] / visits
+        exploitTerms = np.sqrt(math.log(self.visits[node] + 1) / visits)
+        exploitTerms *= explorationConstant
+        if maxNode:
+            return first + int(np.argmax(Q + exploitTerms))
+        return first + int(np.argmin(Q - exploitTerms))
+
+    def mostVisitedChild(self, node):
+        first = int(self.firstChild[node])
+        return first + int(np.argmax(self.visits[first:first + int(self.numChildren[node])]))
+
+    def update(self, node, eval, numVisits=1):
+        """
+        Add numVisits visits with total result eval to node and all its ancestors
+        """
+        visits = self.visits
+        valueSum = self.valueSum
+        parent = self.parent
+        while node != NO_NODE:
+            visits[node] += numVisits
+            valueSum[node] += eval
+            node = parent[node]
+
+    def subtree(self, node):
+        """
+        New tree made of node and its descendants, with node as the root.
+        Nodes are copied one child block at a time, in breadth-first order,
+        so the new tree is compact and the rest of this tree is dropped.
+        """
+        tree = MCTSTree(int(self.color[node]))
+        tree.visits[0] = self.visits[node]
+        tree.valueSum[0] = self.valueSum[node]
+        tree.move[0] = self.move[node]
+        queue = [(node, 0)]    # (id in this tree, id in the new tree) of expanded nodes
+        for old, new in queue:
+            first = int(self.firstChild[old])
+            if first == NO_NODE:
+                continue
+            numChildren = int(self.numChildren[old])
+            if tree.size + numChildren > tree.capacity:
+                tree._grow(numChildren)
+            end = first + numChildren
+            newFirst = tree.size
+            newEnd = newFirst + numChildren
+            tree.firstChild[new] = newFirst
+            tree.numChildren[new] = numChildren
+            tree.visits[newFirst:newEnd] = self.visits[first:end]
+            tree.valueSum[newFirst:newEnd] = self.valueSum[first:end]
+            tree.move[newFirst:newEnd] = self.move[first:end]
+            tree.color[newFirst:newEnd] = self.color[first:end]
+            tree.parent[newFirst:newEnd] = new
+            tree.size = newEnd
+            for i in np.flatnonzero(self.firstChild[first:end] != NO_NODE).tolist():
+                queue.append((first + i, newFirst + i))
+        return tree
+
+    def nbytes(self):
+        """
+        Memory held by the arrays, including room not used yet
+        """
+        return sum(getattr(self, name).nbytes for name in MCTSTree.__slots__[2:])
@@ -0,0 +1,74 @@
+import time
+
+"""
+Nodes between two looks at the clock in SearchControl.tick
+"""
+DEFAULT_CHECK_INTERVAL = 64
+
+class SearchControl(object):
+    """
+    Limits of one search: a deadline, a node budget and a stop flag.
+    The search calls tick() once per node and unwinds when it returns True,
+    so it always ends at a point where its board and statistics are
+    consistent. The clock is only read every checkInterval nodes.
+    stop() may be called from another thread, e.g. by a GTP stop command.
+    A stop that comes before the search it is meant for has started stays
+    pending, and start() applies it, until clearStop() is called.
+    With no limits set, a search runs until it finishes or is stopped.
+    """
+
+    def __init__(self, checkInterval=DEFAULT_CHECK_INTERVAL):
+        self.checkInterval = checkInterval
+        self.deadline = None
+        self.maxNodes = None
+        self.nodes = 0
+        self.nextCheck = checkInterval
+        self.stopped = False
+        self.pendingStop = False
+
+    def start(self, timeLimit=None, maxNodes=None):
+        """
+        Start a new search that may run for timeLimit seconds and
+        maxNodes nodes; None means no limit
+        """
+        self.deadline = None if timeLimit is None else time.time() + timeLimit
+        self.maxNodes = maxNodes
+        self.nodes = 0
+        self.nextCheck = self.checkInterval
+        # cleared before the pending stop is read, so a stop() from another
+        # thread at any point of start() is never lost
+        self.stopped = False
+        if self.pendingStop:
+            self.stopped = True
+
+    def stop(self):
+        self.pendingStop = True
+        self.stopped = True
+
+    def clearStop(self):
+        """
+        Forget a pending stop, once the command that asked for it has been
+        reached in order and no search is left for it to end
+        """
+        self.pendingStop = False
+
+    def tickNow(self):
+        """
+        Count one node and look at the clock right away, for searches
+        whose nodes cost too much to wait checkInterval nodes between checks
+        """
+        self.nextCheck = self.nodes + 1
+        return self.tick()
+
+    def tick(self):
+        """
+        Count one node, and return whether the search has to stop
+        """
+        self.nodes += 1
+        if self.nodes >= self.nextCheck and not self.stopped:
+            self.nextCheck = self.nodes + self.checkInterval
+            if self.maxNodes is not None and self.nodes >= self.maxNodes:
+                self.stopped = True
+            elif self.deadline is not None and time.time() >= self.deadline:
+                self.stopped = True
+        return self.stopped
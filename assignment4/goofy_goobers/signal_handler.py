@@ -1,2 +0,0 @@
-def timeout_handler(signum, frame):
-    raise TimeoutError
\ No newline at end of file